@@ -0,0 +1,154 @@
+# newsletter/archive.py
+
+import os
+import sys
+import gzip
+import time
+import hashlib
+import threading
+from dotenv import load_dotenv
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is used when zstandard isn't installed
+    zstandard = None
+
+load_dotenv()
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(PROJECT_ROOT, "newsletter", "archive"))
+
+# Retention: drop issues older than N days (0 = keep forever), then all but the newest N (0 = no limit)
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "365"))
+ARCHIVE_MAX_ISSUES = int(os.getenv("ARCHIVE_MAX_ISSUES", "0"))
+
+# zstd when the zstandard package is importable, gzip otherwise
+ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "zstd" if zstandard else "gzip").lower()
+if ARCHIVE_COMPRESSION == "zstd" and not zstandard:
+    print("⚠️ ARCHIVE_COMPRESSION=zstd but zstandard is not installed, using gzip")
+    ARCHIVE_COMPRESSION = "gzip"
+
+EXTENSIONS = {"zstd": ".html.zst", "gzip": ".html.gz"}
+READ_ERRORS = (OSError, RuntimeError, EOFError, gzip.BadGzipFile) + ((zstandard.ZstdError,) if zstandard else ())
+
+_lock = threading.Lock()
+
+
+def _compress(data, method):
+    if method == "zstd":
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _decompress(data, method):
+    if method == "zstd":
+        if not zstandard:
+            raise RuntimeError("zstandard is required to read .zst archive entries")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _path(digest, method):
+    return os.path.join(ARCHIVE_DIR, digest[:2], f"{digest}{EXTENSIONS[method]}")
+
+
+def _find(digest):
+    """(path, method) of an archived issue in any supported format, or (None, None)"""
+    for method in EXTENSIONS:
+        path = _path(digest, method)
+        if os.path.exists(path):
+            return path, method
+    return None, None
+
+
+def store(html_content):
+    """
+    Archive an issue once, compressed and addressed by content hash.
+    Returns (content_hash, size in bytes uncompressed), or (None, None) on failure.
+    Storing identical HTML again only refreshes the entry's age.
+    """
+    data = html_content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    with _lock:
+        path, _ = _find(digest)
+        try:
+            if path:
+                os.utime(path)
+                return digest, len(data)
+
+            path = _path(digest, ARCHIVE_COMPRESSION)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_compress(data, ARCHIVE_COMPRESSION))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"❌ Could not archive newsletter: {e}")
+            return None, None
+
+    print(f"   🗄️ Archived {len(data) / 1024:.1f} KB as {os.path.basename(path)} "
+          f"({os.path.getsize(path) / 1024:.1f} KB {ARCHIVE_COMPRESSION})")
+    return digest, len(data)
+
+
+def load(digest):
+    """Decompressed HTML of an archived issue, or None if it's missing, pruned or corrupt"""
+    if not digest:
+        return None
+    path, method = _find(digest)
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = _decompress(f.read(), method)
+    except READ_ERRORS as e:
+        print(f"⚠️ Could not read archived newsletter {digest[:12]}: {e}")
+        return None
+
+    if hashlib.sha256(data).hexdigest() != digest:
+        print(f"⚠️ Archived newsletter {digest[:12]} failed its hash check")
+        return None
+    return data.decode("utf-8")
+
+
+def prune(retention_days=ARCHIVE_RETENTION_DAYS, max_issues=ARCHIVE_MAX_ISSUES):
+    """
+    Apply the retention rules; returns the content hashes removed, so the
+    newsletters rows pointing at them can be cleared (see database.forget_archived_content)
+    """
+    with _lock:
+        entries = []
+        for root, _, files in os.walk(ARCHIVE_DIR):
+            for name in files:
+                if not name.endswith(tuple(EXTENSIONS.values())):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    entries.append((os.stat(path).st_mtime, path))
+                except OSError:
+                    continue
+
+        entries.sort(reverse=True)
+        cutoff = time.time() - retention_days * 86400 if retention_days else None
+        removed = []
+        for position, (mtime, path) in enumerate(entries):
+            if (cutoff is not None and mtime < cutoff) or (max_issues and position >= max_issues):
+                try:
+                    os.remove(path)
+                    removed.append(os.path.basename(path).split(".", 1)[0])
+                except OSError:
+                    pass
+
+    if removed:
+        print(f"🧹 Pruned {len(removed)} archived newsletters")
+    return removed
+
+
+if __name__ == "__main__":
+    # python -m newsletter.archive <content_hash> > issue.html
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m newsletter.archive <content_hash>")
+    html = load(sys.argv[1])
+    if html is None:
+        sys.exit(f"No archived newsletter {sys.argv[1]}")
+    sys.stdout.write(html)
@@ -0,0 +1,116 @@
+# newsletter/assets.py
+
+import os
+import re
+import hashlib
+import mimetypes
+import threading
+from email.mime.image import MIMEImage
+from email.mime.base import MIMEBase
+from email import encoders
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "templates", "assets")
+CID_DOMAIN = "vbit-newsletter"
+
+CID_REF_RE = re.compile(r"""(?:src|background)=["']cid:([^"']+)["']""", re.IGNORECASE)
+
+_assets = {}  # name -> Asset
+_assets_lock = threading.Lock()
+
+
+class Asset:
+    """A bundled file (e.g. the logo) loaded and hashed once, sent as an inline MIME part"""
+
+    def __init__(self, name, path, data, mtime):
+        self.name = name
+        self.path = path
+        self.data = data
+        self.mtime = mtime
+        self.sha256 = hashlib.sha256(data).hexdigest()
+        self.content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        stem = os.path.splitext(os.path.basename(name))[0]
+        # content-derived, so a changed file never reuses a stale cached part
+        self.cid = f"{stem}.{self.sha256[:12]}@{CID_DOMAIN}"
+        self._mime_part = None
+
+    def mime_part(self):
+        """Inline MIME part for this asset, base64-encoded once and reused for every send"""
+        if self._mime_part is None:
+            maintype, subtype = self.content_type.split("/", 1)
+            if maintype == "image":
+                part = MIMEImage(self.data, _subtype=subtype)
+            else:
+                part = MIMEBase(maintype, subtype)
+                part.set_payload(self.data)
+                encoders.encode_base64(part)
+            part.add_header("Content-ID", f"<{self.cid}>")
+            part.add_header("Content-Disposition", "inline", filename=os.path.basename(self.name))
+            self._mime_part = part
+        return self._mime_part
+
+
+def load_asset(name):
+    """Asset from ASSETS_DIR by relative name, cached until the file changes; None if missing"""
+    path = os.path.normpath(os.path.join(ASSETS_DIR, name))
+    if not path.startswith(os.path.normpath(ASSETS_DIR) + os.sep):
+        return None
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+
+    with _assets_lock:
+        cached = _assets.get(name)
+        if cached and cached.mtime == mtime:
+            return cached
+
+    try:
+        with open(path, "rb") as f:
+            asset = Asset(name, path, f.read(), mtime)
+    except OSError as e:
+        print(f"⚠️ Could not load asset {name}: {e}")
+        return None
+
+    with _assets_lock:
+        _assets[name] = asset
+    return asset
+
+
+def asset_name_from_src(src):
+    """'assets/logo.jpg' / '../assets/logo.jpg' style template references -> 'logo.jpg', else None"""
+    if not src or "://" in src or src.startswith(("data:", "cid:")):
+        return None
+    normalized = src.replace("\\", "/")
+    while normalized.startswith("../") or normalized.startswith("./"):
+        normalized = normalized.split("/", 1)[1]
+    if not normalized.startswith("assets/"):
+        return None
+    return normalized[len("assets/"):] or None
+
+
+def asset_cid_reference(src):
+    """`cid:` URL for an image src that points at a bundled asset, else None"""
+    name = asset_name_from_src(src)
+    asset = load_asset(name) if name else None
+    return f"cid:{asset.cid}" if asset else None
+
+
+def assets_for_html(html_content):
+    """Assets referenced by cid: URLs in the HTML, in order of first use"""
+    wanted = dict.fromkeys(CID_REF_RE.findall(html_content))
+    if not wanted:
+        return []
+
+    by_cid = {asset.cid: asset for asset in list(_assets.values())}
+    if any(cid not in by_cid for cid in wanted):
+        # e.g. HTML rendered by another process: load the bundled assets to match their CIDs
+        for root, _, files in os.walk(ASSETS_DIR):
+            for filename in files:
+                asset = load_asset(os.path.relpath(os.path.join(root, filename), ASSETS_DIR))
+                if asset:
+                    by_cid[asset.cid] = asset
+
+    missing = [cid for cid in wanted if cid not in by_cid]
+    if missing:
+        print(f"⚠️ No asset found for {', '.join(missing)}")
+    return [by_cid[cid] for cid in wanted if cid in by_cid]
@@ -0,0 +1,124 @@
+# newsletter/cache.py
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(PROJECT_ROOT, "newsletter", "cache"))
+
+# set() writes "stored_at" first, so it can be read without parsing the whole entry
+STORED_AT_RE = re.compile(rb'^\{"stored_at":\s*([0-9.eE+-]+)')
+
+
+def content_key(data):
+    """Stable SHA-256 key for any JSON-serialisable value"""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Content-addressed JSON cache on disk, one file per entry.
+    Entries expire `ttl` seconds after they were stored (None = never) and the
+    directory is kept under `max_bytes` by evicting least-recently-used files
+    (hits touch mtime, which is only used for that LRU order).
+    """
+
+    def __init__(self, namespace, ttl=None, max_bytes=None, directory=None):
+        self.directory = os.path.join(directory or CACHE_DIR, namespace)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key, ignore_ttl=False):
+        """Return the cached value or None on a miss/expired entry"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not ignore_ttl and self.ttl is not None and time.time() - entry.get("stored_at", 0) > self.ttl:
+            return None
+
+        try:
+            os.utime(path)  # LRU bookkeeping
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key, value, meta=None):
+        """Store a value atomically, then evict down to the size bound"""
+        entry = {"stored_at": time.time(), "meta": meta, "value": value}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Cache write failed ({self.directory}): {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least-recently-used ones until under max_bytes"""
+        with self._lock:
+            try:
+                names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+            except OSError:
+                return
+
+            now = time.time()
+            entries = []
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if self.ttl is not None and now - _stored_at(path, stat.st_mtime) > self.ttl:
+                    _remove(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            if self.max_bytes is None:
+                return
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                _remove(path)
+                total -= size
+
+
+def _stored_at(path, default):
+    """An entry's stored_at from the head of its file (the whole file if needed), else `default`"""
+    try:
+        with open(path, "rb") as f:
+            match = STORED_AT_RE.match(f.read(64))
+            if match:
+                return float(match.group(1))
+            f.seek(0)
+            return float(json.load(f).get("stored_at", default))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return default
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
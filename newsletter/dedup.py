@@ -0,0 +1,163 @@
+# newsletter/dedup.py
+
+import re
+import random
+import hashlib
+from collections import defaultdict
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+# Query parameters that never change which page a URL points at
+TRACKING_PARAMS = {"ref", "ref_src", "fbclid", "gclid", "mc_cid", "mc_eid", "source", "si", "feature"}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_URL_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def normalize_url(url_val):
+    """Canonical form of an article URL: lower-case host without www/m, no fragment or tracking params"""
+    if not url_val or url_val == "#":
+        return None
+    try:
+        parsed = urlparse(url_val.strip())
+    except ValueError:
+        return None
+
+    host = parsed.netloc.lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse(("", host, path, "", urlencode(params), "")).lstrip("/")
+
+
+def hash_url_key(key):
+    """Fixed-length (sha256 hex) form of a URL key, so arbitrarily long URLs fit the key column"""
+    if not key:
+        return None
+    if _URL_KEY_RE.match(key):
+        return key
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def article_url_key(url_val, video_id=None):
+    """Dedup key for an article URL; every URL form of one YouTube video shares a key"""
+    if video_id:
+        return hash_url_key(f"youtube:{video_id}")
+    return hash_url_key(normalize_url(url_val))
+
+
+def normalize_title(title):
+    """Lower-case alphanumeric words of a title, ignoring a trailing ' | Site Name'"""
+    if not title:
+        return None
+    title = title.split(" | ")[0]
+    key = _NON_ALNUM.sub(" ", title.lower()).strip()
+    if not key or key == "untitled":
+        return None
+    return key[:300]
+
+
+# =====================================================
+# 🧬 NEAR-DUPLICATE DETECTION (MinHash + LSH)
+# =====================================================
+# Signatures have MINHASH_PERMUTATIONS values split into LSH_BANDS bands;
+# two articles become candidates if any band matches exactly, then are
+# confirmed by estimated Jaccard similarity of their word shingles.
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 3
+NEAR_DUP_THRESHOLD = 0.5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)  # fixed seed: signatures must be comparable across runs
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of hashed word n-grams of normalized text"""
+    words = _NON_ALNUM.sub(" ", (text or "").lower()).split()
+    if len(words) < size:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for gram in grams
+    }
+
+
+def minhash_signature(text):
+    """MinHash signature (tuple of ints) of a text, or None if it has no words"""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def signature_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def serialize_signature(signature):
+    return " ".join(format(v, "x") for v in signature) if signature else None
+
+
+def deserialize_signature(value):
+    try:
+        signature = tuple(int(v, 16) for v in value.split())
+    except (AttributeError, ValueError):
+        return None
+    return signature if len(signature) == MINHASH_PERMUTATIONS else None
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures; lookups only compare against same-bucket entries"""
+
+    def __init__(self, bands=LSH_BANDS, threshold=NEAR_DUP_THRESHOLD):
+        self.bands = bands
+        self.rows = MINHASH_PERMUTATIONS // bands
+        self.threshold = threshold
+        self.buckets = defaultdict(list)
+        self.signatures = {}
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, key, signature):
+        if not signature or key in self.signatures:
+            return
+        self.signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self.buckets[band_key].append(key)
+
+    def query(self, signature):
+        """Keys of indexed items whose estimated similarity is at least the threshold, best first"""
+        if not signature:
+            return []
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self.buckets.get(band_key, ()))
+        matches = [
+            (key, signature_similarity(signature, self.signatures[key]))
+            for key in candidates
+        ]
+        return sorted(
+            [(key, sim) for key, sim in matches if sim >= self.threshold],
+            key=lambda m: m[1], reverse=True
+        )
+
+    def __len__(self):
+        return len(self.signatures)
@@ -7,6 +7,8 @@ from email.mime.text import MIMEText
 from dotenv import load_dotenv
 from datetime import datetime
 
+from newsletter.assets import assets_for_html
+
 load_dotenv()
 
 # Gmail SMTP Configuration
@@ -15,6 +17,29 @@ GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD")
 RECIPIENT_EMAIL = os.getenv("RECIPIENT_EMAIL", "")
 
 
+def build_message(newsletter_html: str):
+    """
+    MIME message for the newsletter HTML. Assets referenced as cid: URLs are
+    attached as inline parts of a multipart/related message, so the HTML stays
+    small and each image is encoded once.
+    """
+    html_part = MIMEText(newsletter_html, 'html')
+    assets = assets_for_html(newsletter_html)
+    if not assets:
+        msg = MIMEMultipart('alternative')
+        msg.attach(html_part)
+        return msg
+    
+    alternative = MIMEMultipart('alternative')
+    alternative.attach(html_part)
+    msg = MIMEMultipart('related')
+    msg.attach(alternative)
+    for asset in assets:
+        msg.attach(asset.mime_part())
+    print(f"   📎 Attached {len(assets)} inline asset(s)")
+    return msg
+
+
 def send_email(newsletter_html: str, subject: str = None) -> bool:
     """
     Send newsletter using Gmail SMTP
@@ -55,15 +80,11 @@ def send_email(newsletter_html: str, subject: str = None) -> bool:
     
     try:
         # Create message
-        msg = MIMEMultipart('alternative')
+        msg = build_message(newsletter_html)
         msg['From'] = f"VBIT AI Newsletter <{GMAIL_USER}>"
         msg['To'] = ", ".join(recipients)
         msg['Subject'] = subject
         
-        # Attach HTML content
-        html_part = MIMEText(newsletter_html, 'html')
-        msg.attach(html_part)
-        
         # Connect to Gmail SMTP
         print("   🔗 Connecting to Gmail SMTP...")
         server = smtplib.SMTP('smtp.gmail.com', 587)
@@ -0,0 +1,150 @@
+# newsletter/extractive.py
+
+import re
+import math
+from html import escape
+from collections import Counter
+
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])|\n{2,}")
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9'+\-]*")
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "if", "of", "to", "in", "on", "for", "with", "at", "by",
+    "from", "as", "is", "are", "was", "were", "be", "been", "being", "it", "its", "this", "that",
+    "these", "those", "we", "you", "they", "he", "she", "i", "our", "their", "his", "her", "has",
+    "have", "had", "do", "does", "did", "not", "no", "so", "than", "then", "can", "will", "would",
+    "could", "should", "may", "also", "more", "most", "into", "about", "which", "who", "what",
+    "when", "where", "how", "all", "any", "some", "such", "there", "here", "just", "new",
+}
+
+# Lead sentences of news/blog content usually carry the key facts
+LEAD_SENTENCES = 3
+LEAD_BOOST = 1.25
+
+
+def estimate_tokens(text):
+    """
+    Approximate LLM token count: one per punctuation mark and per short word,
+    extra for long words (split into sub-word pieces by BPE tokenizers).
+    """
+    if not text:
+        return 0
+    return sum(1 + len(piece) // 8 for piece in TOKEN_RE.findall(text))
+
+
+def split_sentences(text):
+    return [s.strip() for s in SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+
+
+def score_sentences(sentences):
+    """TF-IDF salience of each sentence, treating sentences as the documents"""
+    words = [[w for w in WORD_RE.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    document_frequency = Counter(w for sentence_words in words for w in set(sentence_words))
+    total = len(sentences)
+
+    scores = []
+    for index, sentence_words in enumerate(words):
+        if not sentence_words:
+            scores.append(0.0)
+            continue
+        counts = Counter(sentence_words)
+        weight = sum(
+            (count / len(sentence_words)) * (1 + math.log(total / document_frequency[word]))
+            # terms repeated across sentences are the article's topic; reward them
+            * (1 + math.log(document_frequency[word]))
+            for word, count in counts.items()
+        )
+        # Favour information-dense sentences without letting long ones dominate
+        weight *= math.sqrt(len(counts))
+        if index < LEAD_SENTENCES:
+            weight *= LEAD_BOOST
+        scores.append(weight)
+    return scores
+
+
+def compress_text(text, token_budget):
+    """
+    Cut text to roughly `token_budget` tokens by keeping its highest-scoring
+    sentences, in their original order. Text already within budget is returned as is.
+    """
+    if not text or token_budget <= 0 or estimate_tokens(text) <= token_budget:
+        return text
+
+    sentences = split_sentences(text)
+    if len(sentences) <= 1:
+        return _truncate_to_budget(text, token_budget)
+
+    scores = score_sentences(sentences)
+    ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+
+    chosen, used = set(), 0
+    for index in ranked:
+        cost = estimate_tokens(sentences[index])
+        if used + cost > token_budget:
+            continue
+        chosen.add(index)
+        used += cost
+
+    if not chosen:
+        return _truncate_to_budget(sentences[ranked[0]], token_budget)
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def _truncate_to_budget(text, token_budget):
+    """Word-boundary cut for text that has no usable sentence structure"""
+    kept, used = [], 0
+    for word in text.split():
+        used += estimate_tokens(word)
+        if used > token_budget:
+            break
+        kept.append(word)
+    return " ".join(kept)
+
+
+# Cue words for the closing "why it matters / impact" section
+IMPACT_CUES = {
+    "enable", "enables", "allow", "allows", "help", "helps", "impact", "developers", "users",
+    "businesses", "researchers", "significant", "faster", "cheaper", "cost", "future", "will",
+    "could", "improve", "improves", "production", "industry", "open-source",
+}
+
+
+def structured_summary(text, headings, bullets=3):
+    """
+    Local, network-free summary in the newsletter's HTML layout: an opening
+    paragraph under headings[0], a bullet list under headings[1] and a closing
+    paragraph under headings[2], filled with the article's top-scoring
+    sentences. Without three headings, returns a two-sentence paragraph.
+    """
+    sentences = [s for s in split_sentences(text or "") if len(s) > 20] or split_sentences(text or "")
+    if not sentences:
+        return "<p></p>"
+    sentences = [_shorten(s) for s in sentences]
+    scores = score_sentences(sentences)
+    ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+
+    if len(headings) < 3:
+        return f"<p>{escape(' '.join(sentences[i] for i in sorted(ranked[:2])))}</p>"
+
+    opening = ranked[0] if 0 not in ranked[:bullets + 2] else 0
+    rest = [i for i in ranked if i != opening]
+    impact = next((i for i in rest if IMPACT_CUES & set(WORD_RE.findall(sentences[i].lower()))), None)
+    points = [i for i in rest if i != impact][:bullets]
+    if impact is None and len(rest) > bullets:
+        impact = rest[bullets]
+
+    html = [f"<p><strong>{headings[0]}</strong><br>\n{escape(sentences[opening])}</p>"]
+    if points:
+        html.append(f"<p><strong>{headings[1]}</strong></p>")
+        html.append("<ul>\n" + "\n".join(f"<li>{escape(sentences[i])}</li>" for i in sorted(points)) + "\n</ul>")
+    if impact is not None:
+        html.append(f"<p><strong>{headings[2]}</strong><br>\n{escape(sentences[impact])}</p>")
+    return "\n".join(html)
+
+
+def _shorten(sentence, limit=220):
+    """Cap a sentence at a word boundary so a single run-on line can't flood a section"""
+    if len(sentence) <= limit:
+        return sentence
+    return sentence[:limit].rsplit(" ", 1)[0].rstrip(",;:") + "…"
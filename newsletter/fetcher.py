@@ -1,360 +1,534 @@
 # newsletter/fetcher.py
 
 import os
-import requests
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from functools import lru_cache
 from dotenv import load_dotenv
-import re
+
+from newsletter import http_client
+from newsletter.cache import DiskCache, content_key
+from newsletter.images import resolve_image
+from newsletter.youtube import YOUTUBE_URL_RE
+from newsletter.dedup import article_url_key, normalize_title, minhash_signature, NearDuplicateIndex
+from newsletter.database import load_published_keys, load_published_signatures
 
 load_dotenv()
 
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+TAVILY_URL = "https://api.tavily.com/search"
 
-def fetch_articles():
-    """
-    Fetch CURATED, CUTTING-EDGE content focused on GenAI, LLMs, Agents, and Deep Learning
-    """
-    url = "https://api.tavily.com/search"
-    headers = {"Content-Type": "application/json"}
-    
-    def search(query, max_results=3):
-        """Enhanced search with image support"""
-        payload = {
-            "api_key": TAVILY_API_KEY,
-            "query": query,
-            "search_depth": "advanced",
-            "max_results": max_results,
-            "include_images": True,
-            "include_raw_content": False,
-        }
-        
-        try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=30)
-            resp.raise_for_status()
-            result = resp.json()
-            return result.get("results", []), result.get("images", [])
-        except Exception as e:
-            print(f"❌ Error fetching from Tavily: {e}")
-            return [], []
-    
-    # =====================================================
-    # 🎯 CURATED SEARCH QUERIES - GENAI, LLMS, AGENTS, DL
-    # =====================================================
-    
+# Per-request timeout and overall deadline (seconds) for the fetch stage
+FETCH_REQUEST_TIMEOUT = float(os.getenv("FETCH_REQUEST_TIMEOUT", "30"))
+FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", "45"))
+
+# Tavily response cache: "readwrite" (default), "off", or "replay" (cache only, no network)
+TAVILY_CACHE_MODE = os.getenv("TAVILY_CACHE_MODE", "readwrite").lower()
+TAVILY_CACHE_TTL = float(os.getenv("TAVILY_CACHE_TTL", "3600"))
+TAVILY_CACHE_MAX_BYTES = int(os.getenv("TAVILY_CACHE_MAX_MB", "50")) * 1024 * 1024
+
+tavily_cache = DiskCache("tavily", ttl=TAVILY_CACHE_TTL, max_bytes=TAVILY_CACHE_MAX_BYTES)
+
+# =====================================================
+# 🎯 CURATED SEARCH QUERIES - GENAI, LLMS, AGENTS, DL
+# =====================================================
+CATEGORY_QUERIES = {
     # 1. LATEST DEVELOPMENTS
-    developments_results, dev_images = search(
+    "development": (
         "latest generative AI breakthroughs LLM GPT-4 Claude Gemini multimodal models "
-        "AI agents autonomous systems RAG vector databases 2025 announcements releases",
-        max_results=5
-    )
-    
+        "AI agents autonomous systems RAG vector databases 2025 announcements releases"
+    ),
     # 2. TRAINING & COURSES
-    training_results, train_images = search(
+    "training": (
         "youtube.com advanced large language model training LLM fine-tuning "
         "AI agent development reinforcement learning from human feedback RLHF "
-        "transformer architecture tutorial deep learning course 2024 2025",
-        max_results=5
-    )
-    
+        "transformer architecture tutorial deep learning course 2024 2025"
+    ),
     # 3. RESEARCH PAPERS
-    research_results, research_images = search(
+    "research": (
         "arxiv.org latest research papers large language models LLM transformers "
         "multi-agent systems chain-of-thought reasoning prompt engineering "
-        "neural networks deep learning October 2025",
-        max_results=5
-    )
-    
+        "neural networks deep learning October 2025"
+    ),
     # 4. STARTUPS & TOOLS
-    startups_results, startups_images = search(
+    "startup": (
         "new generative AI startups LLM API platforms AI agent frameworks "
-        "vector databases AutoGPT LangChain OpenAI Anthropic Cohere founded 2025",
-        max_results=5
-    )
+        "vector databases AutoGPT LangChain OpenAI Anthropic Cohere founded 2025"
+    ),
+}
+
+
+# Category-specific quality keywords (expanded lists)
+QUALITY_KEYWORDS = {
+    "development": [
+        "gpt", "llm", "large language model", "generative ai", "genai",
+        "claude", "gemini", "agent", "autonomous", "multimodal",
+        "rag", "vector", "embedding", "chatbot", "ai assistant",
+        "transformer", "attention", "fine-tuning", "prompt engineering",
+        "api", "model", "training", "inference", "deployment"
+    ],
+    "training": [
+        "tutorial", "course", "learn", "training", "guide",
+        "llm", "transformer", "fine-tuning", "rlhf", "prompt engineering",
+        "langchain", "agent", "deep learning", "neural network",
+        "pytorch", "tensorflow", "hugging face", "practical", "hands-on",
+        "build", "implement", "code", "project"
+    ],
+    "research": [
+        "arxiv", "paper", "research", "study", "neural", "transformer",
+        "attention mechanism", "llm", "language model", "benchmark",
+        "deep learning", "reasoning", "agent", "multi-agent",
+        "novel", "algorithm", "architecture", "experiment", "result",
+        "performance", "accuracy", "dataset"
+    ],
+    "startup": [
+        "startup", "founded", "launch", "platform", "api", "tool",
+        "llm", "genai", "agent", "vector database", "ai platform",
+        "openai", "anthropic", "cohere", "framework", "company",
+        "funding", "product", "service", "enterprise", "solution"
+    ]
+}
+
+# BONUS: Penalize promotional/spam content
+SPAM_INDICATORS = [
+    "click here", "buy now", "limited offer", "sign up today",
+    "exclusive deal", "download now", "free trial", "subscribe"
+]
+
+# BONUS: Prefer content with technical depth indicators
+DEPTH_INDICATORS = [
+    "implementation", "architecture", "algorithm", "framework",
+    "methodology", "approach", "technique", "system", "design",
+    "evaluation", "analysis", "experiment", "benchmark"
+]
+
+# =====================================================
+# 🔎 SINGLE-PASS KEYWORD MATCHING
+# =====================================================
+# Keyword checks keep plain substring semantics ("agent" matches "agents").
+# An all-alphanumeric keyword can only occur inside one alphanumeric run of the
+# text, so the text is split into runs once and each distinct run is resolved to
+# the keywords it contains through a memo that is shared across candidates.
+# Phrases ("deep learning", "fine-tuning") are confirmed against the full text,
+# but only when all of their parts were already seen in some run.
+_SEPARATORS = str.maketrans({c: " " for c in map(chr, range(128)) if not c.isalnum()})
+_ALL_KEYWORDS = (
+    {k for keywords in QUALITY_KEYWORDS.values() for k in keywords}
+    | set(SPAM_INDICATORS) | set(DEPTH_INDICATORS)
+)
+_PHRASES = [
+    (k, frozenset(k.translate(_SEPARATORS).split()))
+    for k in sorted(_ALL_KEYWORDS) if k.translate(_SEPARATORS).split() != [k]
+]
+_RUN_VOCABULARY = sorted(
+    {k for k in _ALL_KEYWORDS if k.translate(_SEPARATORS).split() == [k]}
+    | {part for _, parts in _PHRASES for part in parts}
+)
+_QUALITY_SETS = {category: frozenset(keywords) for category, keywords in QUALITY_KEYWORDS.items()}
+_SPAM_SET = frozenset(SPAM_INDICATORS)
+_DEPTH_SET = frozenset(DEPTH_INDICATORS)
+_run_memo = {}
+_RUN_MEMO_LIMIT = 50000
+
+
+def find_keywords(full_text):
+    """All known keywords (quality, spam and depth) contained in lower-cased text, in one pass"""
+    if len(_run_memo) > _RUN_MEMO_LIMIT:
+        _run_memo.clear()
+    
+    found = set()
+    for run in set(full_text.translate(_SEPARATORS).split()):
+        hits = _run_memo.get(run)
+        if hits is None:
+            hits = _run_memo[run] = frozenset(k for k in _RUN_VOCABULARY if k in run)
+        found |= hits
+    found.update([k for k, parts in _PHRASES if parts <= found and k in full_text])
+    return found
+
+
+def score_content(res, category):
+    """Word count plus quality, spam and depth keyword counts for one search result"""
+    title = (res.get("title") or "").lower()
+    content = (res.get("content") or res.get("snippet") or "").lower()
+    found = find_keywords(title + " " + content)
+    return {
+        "word_count": len(content.split()),
+        "matches": len(found & _QUALITY_SETS.get(category, frozenset())),
+        "spam_count": len(found & _SPAM_SET),
+        "depth_score": len(found & _DEPTH_SET),
+    }
+
+
+def score_candidates(results, category):
+    """Batch scoring: one score dict per search result, in order"""
+    return [score_content(res, category) for res in results]
+
+
+def is_quality_content(res, category, score=None):
+    """ENHANCED: Filter for HIGH-QUALITY, TECHNICAL content"""
+    if score is None:
+        score = score_content(res, category)
+    
+    # INCREASED: Minimum 50 words for technical depth
+    word_count = score["word_count"]
+    if word_count < 50:
+        print(f"   ❌ Rejected: Too short ({word_count} words)")
+        return False
+    
+    # INCREASED: Require 3+ keyword matches for better relevance
+    matches = score["matches"]
+    if matches < 3:
+        print(f"   ❌ Rejected: Low relevance ({matches} keyword matches)")
+        return False
+    
+    spam_count = score["spam_count"]
+    if spam_count >= 2:
+        print(f"   ❌ Rejected: Too promotional ({spam_count} spam indicators)")
+        return False
+    
+    depth_score = score["depth_score"]
+    print(f"   ✅ Quality: {word_count} words, {matches} keywords, {depth_score} depth indicators")
+    return True
+
+
+# =====================================================
+# 🎥 YOUTUBE VIDEO IDS (patterns in newsletter/youtube.py)
+# =====================================================
+@lru_cache(maxsize=4096)
+def extract_video_id(url_val):
+    """ENHANCED: Extract YouTube video ID from ALL URL formats (memoized per URL)"""
+    if not url_val:
+        return None
+    
+    match = YOUTUBE_URL_RE.search(url_val)
+    if match:
+        return match.group(1)
+    
+    # Check if URL contains youtube/youtu keywords but no match
+    lowered = url_val.lower()
+    if 'youtube' in lowered or 'youtu.be' in lowered:
+        print(f"   ⚠️ YouTube URL detected but couldn't extract ID: {url_val}")
+    
+    return None
+
+
+def extract_video_ids(urls):
+    """Batch version of extract_video_id for a list of URLs"""
+    return [extract_video_id(url_val) for url_val in urls]
+
+
+def search_tavily(query, max_results=3, search_depth="advanced", include_images=True,
+                  timeout=FETCH_REQUEST_TIMEOUT):
+    """Enhanced search with image support"""
+    headers = {"Content-Type": "application/json"}
+    payload = {
+        "api_key": TAVILY_API_KEY,
+        "query": query,
+        "search_depth": search_depth,
+        "max_results": max_results,
+        "include_images": include_images,
+        "include_raw_content": False,
+    }
+    
+    # Cache key covers everything that shapes the response, but never the API key
+    cache_key = content_key({k: v for k, v in payload.items() if k != "api_key"})
+    if TAVILY_CACHE_MODE != "off":
+        cached = tavily_cache.get(cache_key, ignore_ttl=TAVILY_CACHE_MODE == "replay")
+        if cached is not None:
+            return cached.get("results", []), cached.get("images", [])
+        if TAVILY_CACHE_MODE == "replay":
+            print(f"⚠️ Replay mode: no cached Tavily response for query: {query[:60]}...")
+            return [], []
+    
+    try:
+        resp = http_client.post(TAVILY_URL, headers=headers, json=payload, timeout=timeout)
+        resp.raise_for_status()
+        result = resp.json()
+        results, images = result.get("results", []), result.get("images", [])
+    except Exception as e:
+        print(f"❌ Error fetching from Tavily: {e}")
+        return [], []
+    
+    if TAVILY_CACHE_MODE != "off":
+        tavily_cache.set(cache_key, {"results": results, "images": images}, meta={"query": query})
+    return results, images
+
+
+def extract_source_name(url_val):
+    """Extract clean source name from URL"""
+    if not url_val:
+        return "GENAI NEWS"
+    try:
+        domain = urlparse(url_val).netloc
+        source = domain.replace("www.", "").split(".")[0]
+        return source.upper()
+    except:
+        return "GENAI NEWS"
+
+
+IMAGE_KEYWORDS = {
+    "development": "artificial+intelligence+neural+network",
+    "training": "machine+learning+programming",
+    "research": "data+science+technology",
+    "startup": "innovation+technology+startup"
+}
+
+
+def image_candidates(res, image_pool, article_type, index=0, video_id=None):
+    """Candidate image URLs for an article, best first"""
+    candidates = []
+    if res.get("image"):
+        candidates.append(res["image"])
+    
+    if image_pool and len(image_pool) > index:
+        candidates.append(image_pool[index])
+    
+    if video_id:
+        candidates.append(f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg")
+        candidates.append(f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg")
+    
+    # Stock fallback; the sig is derived from the title so the URL (and its probe) is cacheable
+    seed = int(hashlib.sha1((res.get("title") or "").encode("utf-8")).hexdigest()[:12], 16)
+    keyword = IMAGE_KEYWORDS.get(article_type, "technology")
+    candidates.append(f"https://source.unsplash.com/800x450/?{keyword}&sig={seed}")
+    return candidates
+
+
+def format_article(res, article_type, image_pool=[], index=0, score=None):
+    """Format article with comprehensive metadata"""
+    if not res:
+        return None
+    
+    url_val = res.get("url", "#")
+    content_val = res.get("content") or res.get("snippet") or res.get("title") or ""
+    
+    if not is_quality_content(res, article_type, score):
+        return None
+    
+    video_id = extract_video_id(url_val)
+    candidates = image_candidates(res, image_pool, article_type, index, video_id)
     
-    def extract_source_name(url_val):
-        """Extract clean source name from URL"""
-        if not url_val:
-            return "GENAI NEWS"
+    published_date = res.get("published_date")
+    if not published_date:
+        published_date = datetime.now().strftime("%b %d, %Y")
+    else:
         try:
-            domain = urlparse(url_val).netloc
-            source = domain.replace("www.", "").split(".")[0]
-            return source.upper()
+            if isinstance(published_date, str):
+                date_obj = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+                published_date = date_obj.strftime("%b %d, %Y")
         except:
-            return "GENAI NEWS"
+            published_date = datetime.now().strftime("%b %d, %Y")
     
-    def extract_video_id(url_val):
-        """ENHANCED: Extract YouTube video ID from ALL URL formats"""
-        if not url_val:
-            return None
-        
-        # Comprehensive YouTube URL patterns
-        patterns = [
-            # Standard: https://www.youtube.com/watch?v=VIDEO_ID
-            r'(?:youtube\.com\/watch\?v=)([a-zA-Z0-9_-]{11})',
-            
-            # Short: https://youtu.be/VIDEO_ID
-            r'(?:youtu\.be\/)([a-zA-Z0-9_-]{11})',
-            
-            # Embed: https://www.youtube.com/embed/VIDEO_ID
-            r'(?:youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-            
-            # Shorts: https://www.youtube.com/shorts/VIDEO_ID
-            r'(?:youtube\.com\/shorts\/)([a-zA-Z0-9_-]{11})',
-            
-            # Mobile: https://m.youtube.com/watch?v=VIDEO_ID
-            r'(?:m\.youtube\.com\/watch\?v=)([a-zA-Z0-9_-]{11})',
-            
-            # Live: https://www.youtube.com/live/VIDEO_ID
-            r'(?:youtube\.com\/live\/)([a-zA-Z0-9_-]{11})',
-            
-            # Video with timestamp: ?v=VIDEO_ID&t=123s
-            r'[?&]v=([a-zA-Z0-9_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url_val)
-            if match:
-                video_id = match.group(1)
-                print(f"   🎥 Extracted YouTube ID: {video_id}")
-                return video_id
-        
-        # Check if URL contains youtube/youtu keywords but no match
-        if 'youtube' in url_val.lower() or 'youtu.be' in url_val.lower():
-            print(f"   ⚠️ YouTube URL detected but couldn't extract ID: {url_val}")
-        
+    return {
+        "title": res.get("title") or "Untitled",
+        "url": url_val,
+        "link": url_val,
+        "content": content_val,
+        "image": candidates[0],
+        "image_candidates": candidates,
+        "video_id": video_id,
+        "source": extract_source_name(url_val),
+        "published_date": published_date,
+        "score": res.get("score", 0.0),
+        "category": article_type
+    }
+
+
+def is_already_published(res, published):
+    """O(1) check of a search result against the (url_keys, title_keys) of sent issues"""
+    url_keys, title_keys = published
+    url_key = article_url_key(res.get("url"), extract_video_id(res.get("url") or ""))
+    if url_key and url_key in url_keys:
+        return True
+    title_key = normalize_title(res.get("title"))
+    return bool(title_key) and title_key in title_keys
+
+
+def load_near_duplicate_index():
+    """LSH index seeded with signatures of articles from recently sent issues"""
+    index = NearDuplicateIndex()
+    for label, signature in load_published_signatures():
+        index.add(label, signature)
+    return index
+
+
+def get_best_article(results, images, category, published, near_duplicates):
+    """Pick BEST, MOST RELEVANT article"""
+    if not results:
         return None
     
-    def get_high_quality_image(res, image_pool, article_type, index=0):
-        """Get UNIQUE image per article"""
-        if res.get("image"):
-            return res["image"]
-        
-        if image_pool and len(image_pool) > index:
-            return image_pool[index]
-        
-        video_id = extract_video_id(res.get("url", ""))
-        if video_id:
-            return f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg"
-        
-        keywords = {
-            "development": "artificial+intelligence+neural+network",
-            "training": "machine+learning+programming",
-            "research": "data+science+technology",
-            "startup": "innovation+technology+startup"
-        }
-        
-        import time
-        seed = hash(res.get("title", "")) + int(time.time() * 1000)
-        keyword = keywords.get(article_type, "technology")
-        return f"https://source.unsplash.com/800x450/?{keyword}&sig={abs(seed)}"
+    # Drop anything featured in an earlier issue, or a syndicated copy of a story
+    # already covered recently or by an earlier category, before any scoring/formatting work
+    fresh = []
+    signatures = {}
+    for idx, res in enumerate(results):
+        if is_already_published(res, published):
+            print(f"   ⏭️ Skipped: already published ({res.get('url')})")
+            continue
+        signature = minhash_signature(f"{res.get('title') or ''} {res.get('content') or res.get('snippet') or ''}")
+        duplicates = near_duplicates.query(signature)
+        if duplicates:
+            key, similarity = duplicates[0]
+            print(f"   ⏭️ Skipped: near-duplicate ({similarity:.0%}) of {key}")
+            continue
+        signatures[idx] = signature
+        fresh.append((idx, res))
     
-    def is_quality_content(res, category):
-        """ENHANCED: Filter for HIGH-QUALITY, TECHNICAL content"""
-        title = (res.get("title") or "").lower()
-        content = (res.get("content") or res.get("snippet") or "").lower()
-        full_text = title + " " + content
-        
-        # INCREASED: Minimum 50 words for technical depth
-        word_count = len(content.split())
-        if word_count < 50:
-            print(f"   ❌ Rejected: Too short ({word_count} words)")
-            return False
-        
-        # Category-specific quality keywords (expanded lists)
-        quality_keywords = {
-            "development": [
-                "gpt", "llm", "large language model", "generative ai", "genai",
-                "claude", "gemini", "agent", "autonomous", "multimodal",
-                "rag", "vector", "embedding", "chatbot", "ai assistant",
-                "transformer", "attention", "fine-tuning", "prompt engineering",
-                "api", "model", "training", "inference", "deployment"
-            ],
-            "training": [
-                "tutorial", "course", "learn", "training", "guide",
-                "llm", "transformer", "fine-tuning", "rlhf", "prompt engineering",
-                "langchain", "agent", "deep learning", "neural network",
-                "pytorch", "tensorflow", "hugging face", "practical", "hands-on",
-                "build", "implement", "code", "project"
-            ],
-            "research": [
-                "arxiv", "paper", "research", "study", "neural", "transformer",
-                "attention mechanism", "llm", "language model", "benchmark",
-                "deep learning", "reasoning", "agent", "multi-agent",
-                "novel", "algorithm", "architecture", "experiment", "result",
-                "performance", "accuracy", "dataset"
-            ],
-            "startup": [
-                "startup", "founded", "launch", "platform", "api", "tool",
-                "llm", "genai", "agent", "vector database", "ai platform",
-                "openai", "anthropic", "cohere", "framework", "company",
-                "funding", "product", "service", "enterprise", "solution"
-            ]
-        }
-        
-        keywords = quality_keywords.get(category, [])
-        matches = sum(1 for keyword in keywords if keyword in full_text)
-        
-        # INCREASED: Require 3+ keyword matches for better relevance
-        if matches < 3:
-            print(f"   ❌ Rejected: Low relevance ({matches} keyword matches)")
-            return False
-        
-        # BONUS: Penalize promotional/spam content
-        spam_indicators = [
-            "click here", "buy now", "limited offer", "sign up today",
-            "exclusive deal", "download now", "free trial", "subscribe"
-        ]
-        spam_count = sum(1 for spam in spam_indicators if spam in full_text)
-        
-        if spam_count >= 2:
-            print(f"   ❌ Rejected: Too promotional ({spam_count} spam indicators)")
-            return False
-        
-        # BONUS: Prefer content with technical depth indicators
-        depth_indicators = [
-            "implementation", "architecture", "algorithm", "framework",
-            "methodology", "approach", "technique", "system", "design",
-            "evaluation", "analysis", "experiment", "benchmark"
-        ]
-        depth_score = sum(1 for indicator in depth_indicators if indicator in full_text)
-        
-        print(f"   ✅ Quality: {word_count} words, {matches} keywords, {depth_score} depth indicators")
-        return True
+    quality_results = []
+    scores = score_candidates([res for _, res in fresh], category)
+    for (idx, res), score in zip(fresh, scores):
+        article = format_article(res, category, images, idx, score)
+        if article:
+            article["minhash"] = signatures[idx]
+            quality_results.append((article, res.get("score", 0)))
     
-    def format_article(res, article_type, image_pool=[], index=0):
-        """Format article with comprehensive metadata"""
-        if not res:
-            return None
-        
-        url_val = res.get("url", "#")
-        content_val = res.get("content") or res.get("snippet") or res.get("title") or ""
-        
-        if not is_quality_content(res, article_type):
-            return None
-        
-        image = get_high_quality_image(res, image_pool, article_type, index)
-        video_id = extract_video_id(url_val)
-        
-        published_date = res.get("published_date")
-        if not published_date:
-            published_date = datetime.now().strftime("%b %d, %Y")
-        else:
-            try:
-                if isinstance(published_date, str):
-                    date_obj = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
-                    published_date = date_obj.strftime("%b %d, %Y")
-            except:
-                published_date = datetime.now().strftime("%b %d, %Y")
-        
-        return {
-            "title": res.get("title") or "Untitled",
-            "url": url_val,
-            "link": url_val,
-            "content": content_val,
-            "image": image,
-            "video_id": video_id,
-            "source": extract_source_name(url_val),
-            "published_date": published_date,
-            "score": res.get("score", 0.0),
-            "category": article_type
-        }
+    if not quality_results:
+        return None
     
-    def get_best_article(results, images, category):
-        """Pick BEST, MOST RELEVANT article"""
-        if not results:
-            return None
-        
-        quality_results = []
-        for idx, res in enumerate(results):
-            article = format_article(res, category, images, idx)
-            if article:
-                quality_results.append((article, res.get("score", 0)))
-        
-        if not quality_results:
-            return None
-        
-        # Prioritize video content
-        video_articles = [(a, s) for a, s in quality_results if a.get("video_id")]
-        if video_articles:
-            return max(video_articles, key=lambda x: x[1])[0]
-        
-        return max(quality_results, key=lambda x: x[1])[0]
+    # Prioritize video content
+    video_articles = [(a, s) for a, s in quality_results if a.get("video_id")]
+    best = max(video_articles or quality_results, key=lambda x: x[1])[0]
+    
+    # Only the winner's images are probed; broken URLs never reach the template
+    best["image"] = resolve_image(best.pop("image_candidates"))
     
-    development = get_best_article(developments_results, dev_images, "development")
-    training = get_best_article(training_results, train_images, "training")
-    research = get_best_article(research_results, research_images, "research")
-    startup = get_best_article(startups_results, startups_images, "startup")
+    # Later categories must not pick the same story again
+    near_duplicates.add(f"{category}: {best['url']}", best["minhash"])
+    return best
+
+
+def stream_search_results(concurrent=True, deadline=FETCH_DEADLINE):
+    """
+    Yield (category, (results, images)) as each category search finishes, and
+    ("tools", tools) when the trending tools query does.
+    In concurrent mode every query is in flight at once, so nothing waits on the
+    slowest request. Anything still running when the deadline passes is yielded
+    empty (categories) or as the curated list (tools).
+    """
+    if not concurrent:
+        for category, query in CATEGORY_QUERIES.items():
+            yield category, search_tavily(query, max_results=5)
+        yield "tools", fetch_trending_genai_tools()
+        return
     
-    # Fetch trending GenAI tools
-    trending_tools = fetch_trending_genai_tools()
+    executor = ThreadPoolExecutor(max_workers=len(CATEGORY_QUERIES) + 1)
+    futures = {
+        executor.submit(search_tavily, query, max_results=5): category
+        for category, query in CATEGORY_QUERIES.items()
+    }
+    futures[executor.submit(fetch_trending_genai_tools)] = "tools"
     
-    articles = [development, training, research, startup]
-    total = sum(1 for a in articles if a)
-    videos = sum(1 for a in articles if a and a.get("video_id"))
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            yield futures.pop(future), future.result()
+    except FuturesTimeout:
+        for category in futures.values():
+            if category == "tools":
+                print(f"⏱️ Fetch deadline ({deadline:.0f}s) passed before tools finished, using curated list")
+                yield "tools", list(CURATED_TOOLS)
+            else:
+                print(f"⏱️ Fetch deadline ({deadline:.0f}s) passed before {category} finished")
+                yield category, ([], [])
+    finally:
+        # Don't block on stragglers - their per-request timeout will end them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def stream_articles(concurrent=True, deadline=FETCH_DEADLINE, published=None, near_duplicates=None):
+    """
+    Yield (category, best_article_or_None) as soon as each category's search is
+    filtered and ranked, then ("tools", tools). Downstream stages (summaries) can
+    start on a category without waiting for the slower ones.
+    `published` holds (url_keys, title_keys) of articles already sent and `near_duplicates`
+    a NearDuplicateIndex of recent stories; both are loaded from the DB by default.
+    """
+    if published is None:
+        published = load_published_keys()
+    if near_duplicates is None:
+        near_duplicates = load_near_duplicate_index()
     
+    for category, item in stream_search_results(concurrent=concurrent, deadline=deadline):
+        if category == "tools":
+            yield category, item
+        else:
+            results, images = item
+            yield category, get_best_article(results, images, category, published, near_duplicates)
+
+
+def print_content_summary(articles):
+    """Log which categories were filled and how many are videos"""
+    development, training, research, startup = (
+        articles.get(category) for category in ["development", "training", "research", "startup"]
+    )
     print(f"\n📊 Curated Content Summary:")
     print(f"   🚀 Latest GenAI/LLM Developments: {'✅ Video' if development and development.get('video_id') else '✅ Article'}")
     print(f"   🎓 Advanced Training/Courses: {'✅ Video' if training and training.get('video_id') else '✅ Article'}")
     print(f"   🔬 Cutting-Edge Research: {'✅ Video' if research and research.get('video_id') else '✅ Article'}")
     print(f"   💡 GenAI Startups/Tools: {'✅ Video' if startup and startup.get('video_id') else '✅ Article'}")
-    print(f"   🛠️  Trending Tools: {len(trending_tools)} tools")
-    print(f"   📈 Total: {total} curated articles ({videos} videos)")
-    
-    return {
-        "development": development,
-        "training": training,
-        "research": research,
-        "startup": startup,
-        "tools": trending_tools,
-        "total_articles": total,
-        "video_count": videos,
+    print(f"   🛠️  Trending Tools: {len(articles.get('tools', []))} tools")
+    print(f"   📈 Total: {articles['total_articles']} curated articles ({articles['video_count']} videos)")
+
+
+def count_articles(articles):
+    """Fill in total_articles and video_count for a category -> article mapping"""
+    picked = [articles.get(category) for category in ["development", "training", "research", "startup"]]
+    articles["total_articles"] = sum(1 for a in picked if a)
+    articles["video_count"] = sum(1 for a in picked if a and a.get("video_id"))
+    return articles
+
+
+def fetch_articles(concurrent=True, deadline=FETCH_DEADLINE, published=None, near_duplicates=None):
+    """
+    Fetch CURATED, CUTTING-EDGE content focused on GenAI, LLMs, Agents, and Deep Learning
+    """
+    articles = {"development": None, "training": None, "research": None, "startup": None, "tools": []}
+    articles.update(stream_articles(concurrent, deadline, published, near_duplicates))
+    count_articles(articles)
+    print_content_summary(articles)
+    return articles
+
+
+# FALLBACK: Curated list of top GenAI tools with clean descriptions
+CURATED_TOOLS = [
+    {
+        "name": "LangChain",
+        "description": "Framework for developing applications powered by language models. Build LLM apps with chains, agents, and memory components.",
+        "link": "https://langchain.com"
+    },
+    {
+        "name": "Pinecone",
+        "description": "Vector database for AI applications. Store and retrieve embeddings at scale for semantic search and RAG systems.",
+        "link": "https://pinecone.io"
+    },
+    {
+        "name": "AutoGPT",
+        "description": "Autonomous AI agents that can execute complex tasks with minimal human input using GPT-4 and chain-of-thought reasoning.",
+        "link": "https://github.com/Significant-Gravitas/AutoGPT"
+    },
+    {
+        "name": "LlamaIndex",
+        "description": "Data framework for LLM applications. Connect custom data sources to large language models with ease.",
+        "link": "https://llamaindex.ai"
     }
+]
 
 
 def fetch_trending_genai_tools():
     """Fetch CURATED trending GenAI/LLM tools with CLEAN descriptions"""
     
-    # FALLBACK: Curated list of top GenAI tools with clean descriptions
-    curated_tools = [
-        {
-            "name": "LangChain",
-            "description": "Framework for developing applications powered by language models. Build LLM apps with chains, agents, and memory components.",
-            "link": "https://langchain.com"
-        },
-        {
-            "name": "Pinecone",
-            "description": "Vector database for AI applications. Store and retrieve embeddings at scale for semantic search and RAG systems.",
-            "link": "https://pinecone.io"
-        },
-        {
-            "name": "AutoGPT",
-            "description": "Autonomous AI agents that can execute complex tasks with minimal human input using GPT-4 and chain-of-thought reasoning.",
-            "link": "https://github.com/Significant-Gravitas/AutoGPT"
-        },
-        {
-            "name": "LlamaIndex",
-            "description": "Data framework for LLM applications. Connect custom data sources to large language models with ease.",
-            "link": "https://llamaindex.ai"
-        }
-    ]
+    curated_tools = list(CURATED_TOOLS)
     
     # Try to fetch from API, but use curated list as fallback
-    url = "https://api.tavily.com/search"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "api_key": os.getenv("TAVILY_API_KEY"),
-        "query": "LangChain Pinecone vector database LlamaIndex AI agent frameworks 2025",
-        "search_depth": "basic",
-        "max_results": 6,
-        "include_images": False,
-    }
-    
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=20)
-        resp.raise_for_status()
-        result = resp.json()
-        results = result.get("results", [])
+        results, _ = search_tavily(
+            "LangChain Pinecone vector database LlamaIndex AI agent frameworks 2025",
+            max_results=6,
+            search_depth="basic",
+            include_images=False,
+            timeout=20,
+        )
         
         if not results:
             return curated_tools
@@ -0,0 +1,368 @@
+# newsletter/html_transform.py
+
+import re
+from html import escape, unescape
+from html.parser import HTMLParser
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+from newsletter.youtube import YOUTUBE_EMBED_URL_RE
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+}
+CHARREF_RE = re.compile(r"&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);")
+
+# Content the parser passes through raw (no character references to decode or re-escape)
+RAW_TEXT_ELEMENTS = {"script", "style"}
+
+
+class HTMLVisitor:
+    """
+    Base class for transform steps. Hooks run in visitor order for every node:
+    start_tag returns the (possibly modified) attribute list, or a string of
+    HTML that replaces the whole element including its content; data returns
+    the (possibly modified) text. end_document may return HTML to append.
+    """
+
+    def start_tag(self, tag, attrs):
+        return attrs
+
+    def data(self, text, tag):
+        return text
+
+    def end_document(self):
+        return None
+
+
+class HTMLTransformer(HTMLParser):
+    """
+    Parses a document once and serializes it once, letting every visitor see
+    each node on the way through. Unchanged tags are copied through verbatim;
+    text reaches visitors with character references decoded and is escaped
+    again on output, so a bare "&" (e.g. "AI&ML") comes out as "&amp;".
+    """
+
+    def __init__(self, visitors):
+        super().__init__(convert_charrefs=True)
+        self.visitors = visitors
+        self.out = []
+        self.open_tags = []
+        self.skip_tag = None  # element being replaced: (tag, nesting depth)
+
+    def _visit_start(self, tag, attrs, self_closing):
+        if self.skip_tag:
+            if tag == self.skip_tag[0] and not self_closing and tag not in VOID_ELEMENTS:
+                self.skip_tag = (tag, self.skip_tag[1] + 1)
+            return
+
+        original = attrs
+        for visitor in self.visitors:
+            result = visitor.start_tag(tag, attrs)
+            if isinstance(result, str):
+                self.out.append(result)
+                if not self_closing and tag not in VOID_ELEMENTS:
+                    self.skip_tag = (tag, 1)
+                return
+            attrs = result
+
+        if attrs is original:
+            self.out.append(self.get_starttag_text())
+        else:
+            rendered = "".join(
+                f" {name}" if value is None else f' {name}="{_escape_attr(value)}"'
+                for name, value in attrs
+            )
+            self.out.append(f"<{tag}{rendered}{' /' if self_closing else ''}>")
+        if not self_closing and tag not in VOID_ELEMENTS:
+            self.open_tags.append(tag)
+
+    def handle_starttag(self, tag, attrs):
+        self._visit_start(tag, attrs, self_closing=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._visit_start(tag, attrs, self_closing=True)
+
+    def handle_endtag(self, tag):
+        if self.skip_tag:
+            if tag == self.skip_tag[0]:
+                depth = self.skip_tag[1] - 1
+                self.skip_tag = (tag, depth) if depth else None
+            return
+        if tag in self.open_tags:
+            while self.open_tags and self.open_tags.pop() != tag:
+                pass
+        self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if self.skip_tag:
+            return
+        current = self.open_tags[-1] if self.open_tags else None
+        for visitor in self.visitors:
+            data = visitor.data(data, current)
+        self.out.append(data if current in RAW_TEXT_ELEMENTS else _escape_text(data))
+
+    def _passthrough(self, text):
+        if not self.skip_tag:
+            self.out.append(text)
+
+    def handle_comment(self, data):
+        self._passthrough(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        self._passthrough(f"<!{decl}>")
+
+    def handle_pi(self, data):
+        self._passthrough(f"<?{data}>")
+
+    def unknown_decl(self, data):
+        self._passthrough(f"<![{data}]>")
+
+    def result(self):
+        self.close()
+        for visitor in self.visitors:
+            extra = visitor.end_document()
+            if extra:
+                self.out.append(extra)
+        return "".join(self.out)
+
+
+def transform_html(html_content, visitors):
+    """Run all visitors over the document in a single parse/serialize pass"""
+    if not visitors:
+        return html_content
+    transformer = HTMLTransformer(visitors)
+    transformer.feed(html_content)
+    return transformer.result()
+
+
+def _escape_text(text):
+    """Escape decoded text content; non-breaking spaces go back to &nbsp; so minifiers keep them"""
+    return escape(text, quote=False).replace("\xa0", "&nbsp;")
+
+
+def _escape_attr(value):
+    """Escape an attribute value for double quotes, leaving single quotes (common in inline CSS) as is"""
+    return escape(value, quote=False).replace('"', "&quot;")
+
+
+def _get_attr(attrs, name):
+    return next((value for key, value in attrs if key == name), None)
+
+
+def _set_attr(attrs, name, value):
+    """Copy of attrs with `name` set to `value`, keeping attribute order"""
+    if any(key == name for key, _ in attrs):
+        return [(k, value if k == name else v) for k, v in attrs]
+    return attrs + [(name, value)]
+
+
+# =====================================================
+# VISITORS
+# =====================================================
+
+def youtube_thumbnail_html(video_id):
+    """Full-width clickable thumbnail that replaces an embedded YouTube player"""
+    return f'''
+        <a href="https://www.youtube.com/watch?v={video_id}"
+           style="display: block; text-align: center; text-decoration: none; margin: 20px 0;">
+            <img src="https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg"
+                 alt="YouTube Video"
+                 style="max-width: 100%; height: auto; border-radius: 8px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+            <p style="margin-top: 12px; color: #667eea; font-weight: 600; font-size: 16px;">
+                ▶ Click to Watch on YouTube
+            </p>
+        </a>
+        '''
+
+
+class YouTubeThumbnailVisitor(HTMLVisitor):
+    """Replace <iframe src=".../embed/ID"> players and links to embed URLs with thumbnails"""
+
+    def start_tag(self, tag, attrs):
+        if tag not in ("iframe", "a"):
+            return attrs
+        url = _get_attr(attrs, "src" if tag == "iframe" else "href") or ""
+        match = YOUTUBE_EMBED_URL_RE.match(url)
+        if match:
+            return youtube_thumbnail_html(match.group(1))
+        return attrs
+
+
+class AssetRewriteVisitor(HTMLVisitor):
+    """Rewrite <img src> values through `resolve(src)`, which returns a new URL or None to keep it"""
+
+    def __init__(self, resolve):
+        self.resolve = resolve
+
+    def start_tag(self, tag, attrs):
+        if tag != "img":
+            return attrs
+        src = _get_attr(attrs, "src")
+        new_src = self.resolve(src) if src else None
+        return _set_attr(attrs, "src", new_src) if new_src and new_src != src else attrs
+
+
+class LinkTaggingVisitor(HTMLVisitor):
+    """
+    Add tracking query parameters (e.g. utm_source/utm_medium) to outbound
+    http(s) links, leaving links that already carry them or that start with
+    one of `skip_prefixes` (feedback, unsubscribe...) untouched.
+    """
+
+    def __init__(self, params, skip_prefixes=()):
+        self.params = dict(params)
+        self.skip_prefixes = tuple(p for p in skip_prefixes if p and p != "#")
+
+    def start_tag(self, tag, attrs):
+        if tag != "a" or not self.params:
+            return attrs
+        href = _get_attr(attrs, "href")
+        if not href or not href.startswith(("http://", "https://")) or href.startswith(self.skip_prefixes):
+            return attrs
+        parsed = urlparse(href)
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        existing = {key for key, _ in query}
+        added = [(k, v) for k, v in self.params.items() if k not in existing]
+        if not added:
+            return attrs
+        return _set_attr(attrs, "href", urlunparse(parsed._replace(query=urlencode(query + added))))
+
+
+class CSSInlineVisitor(HTMLVisitor):
+    """
+    Minimal CSS inliner for the common email case: rules in <style> blocks
+    that use simple selectors (tag, .class, tag.class, #id) are merged into
+    the matching elements' style attributes, lowest specificity first and
+    existing inline styles last. @media and other at-rules stay in the
+    <style> block; any other selector sets `unsupported` so the caller can
+    fall back to a full inliner.
+    """
+
+    SIMPLE_SELECTOR_RE = re.compile(r"^([a-z][a-z0-9]*)?(?:([.#])([a-zA-Z_][\w-]*))?$")
+
+    def __init__(self):
+        self.rules = []  # (specificity, order, tag, kind, name, declarations)
+        self.unsupported = []
+        self._in_style = False
+
+    def start_tag(self, tag, attrs):
+        if tag == "style":
+            self._in_style = True
+            return attrs
+        if not self.rules:
+            return attrs
+
+        classes = set((_get_attr(attrs, "class") or "").split())
+        element_id = _get_attr(attrs, "id")
+        matched = []
+        for specificity, order, rule_tag, kind, name, declarations in self.rules:
+            if rule_tag and rule_tag != tag:
+                continue
+            if kind == "." and name not in classes:
+                continue
+            if kind == "#" and name != element_id:
+                continue
+            matched.append((specificity, order, declarations))
+        if not matched:
+            return attrs
+
+        inline = parse_declarations(_get_attr(attrs, "style") or "")
+        if inline is None:
+            return attrs  # can't merge into a style we can't parse safely
+
+        merged = {}
+        for _, _, declarations in sorted(matched):
+            merged.update(declarations)
+        merged.update(inline)
+        return _set_attr(attrs, "style", "; ".join(f"{k}:{v}" for k, v in merged.items()))
+
+    def data(self, text, tag):
+        if tag != "style" or not self._in_style:
+            return text
+        self._in_style = False
+        return self._collect_rules(text)
+
+    def _collect_rules(self, css):
+        """Store inlinable rules; return the CSS that must stay in the <style> block"""
+        css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+        kept, depth, start = [], 0, 0
+        for index, char in enumerate(css):
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    block = css[start:index + 1].strip()
+                    start = index + 1
+                    if block.startswith("@"):
+                        kept.append(block)
+                    elif not self._add_rule(block):
+                        kept.append(block)
+        return "\n".join(kept)
+
+    def _add_rule(self, block):
+        selectors, _, body = block[:-1].partition("{")
+        declarations = parse_declarations(body)
+        if declarations is None:
+            self.unsupported.append(selectors.strip())
+            return False
+        added = True
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            match = self.SIMPLE_SELECTOR_RE.match(selector)
+            if not selector or not match or not (match.group(1) or match.group(3)):
+                self.unsupported.append(selector)
+                added = False
+                continue
+            rule_tag, kind, name = match.group(1), match.group(2), match.group(3)
+            specificity = (1 if kind == "#" else 0, 1 if kind == "." else 0, 1 if rule_tag else 0)
+            self.rules.append((specificity, len(self.rules), rule_tag, kind, name, declarations))
+        return added
+
+
+def split_declarations(css):
+    """
+    Split a CSS declaration list on the semicolons that end declarations, not
+    those inside quotes, parentheses (url(data:image/png;base64,...)) or
+    character references (&quot;). Returns None if quotes or parentheses
+    don't balance.
+    """
+    parts, start, quote, depth, i = [], 0, None, 0, 0
+    while i < len(css):
+        entity = CHARREF_RE.match(css, i) if css[i] == "&" else None
+        char = unescape(entity.group(0)) if entity else css[i]
+        step = entity.end() - i if entity else 1
+        if quote:
+            if char == quote:
+                quote = None
+            elif char == "\\":
+                step += 1
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                return None
+        elif char == ";" and not entity and depth == 0:
+            parts.append(css[start:i])
+            start = i + 1
+        i += step
+    if quote or depth:
+        return None
+    parts.append(css[start:])
+    return parts
+
+
+def parse_declarations(css):
+    """Ordered {property: value} from a CSS declaration list, or None if it can't be parsed safely"""
+    parts = split_declarations(css)
+    if parts is None:
+        return None
+    declarations = {}
+    for part in parts:
+        name, sep, value = part.partition(":")
+        if sep and name.strip() and value.strip():
+            declarations[name.strip().lower()] = value.strip()
+    return declarations
@@ -0,0 +1,176 @@
+# newsletter/http_client.py
+
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Connection pooling (pool size is per host)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))
+
+# Retry policy
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "8"))
+HTTP_RETRY_AFTER_MAX = float(os.getenv("HTTP_RETRY_AFTER_MAX", "30"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Circuit breaker: open after N consecutive failures, retry after cooldown
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "60"))
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a host whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for a single host"""
+
+    def __init__(self, host, threshold=BREAKER_FAILURE_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Closed: allow. Open: fail fast until the cooldown passes, then let a
+        single probe through; everyone else keeps failing fast until the probe
+        is recorded as a success (close) or failure (re-open).
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self.probe_in_flight and time.monotonic() - self.opened_at >= self.cooldown:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def is_open(self):
+        """Open and still cooling down, or waiting on its probe (read-only, unlike allow)"""
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            return self.probe_in_flight or time.monotonic() - self.opened_at < self.cooldown
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probe_in_flight:
+                # failed probe: open again for another cooldown
+                self.probe_in_flight = False
+                self.opened_at = time.monotonic()
+                print(f"🔌 Circuit re-opened for {self.host} (probe failed)")
+            elif self.failures >= self.threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                print(f"🔌 Circuit open for {self.host} ({self.failures} consecutive failures)")
+
+
+_session = None
+_session_lock = threading.Lock()
+_breakers = {}
+
+
+def get_session():
+    """Shared keep-alive session used by every outbound API call"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                pool_block=True,
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def get_breaker(url):
+    """Circuit breaker for the host of a URL"""
+    host = urlparse(url).netloc
+    with _session_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def retry_after_delay(response):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def post(url, max_retries=HTTP_MAX_RETRIES, **kwargs):
+    """
+    POST through the shared session with retries and a per-host circuit breaker.
+    Retries connection errors, timeouts and 429/5xx responses with jittered
+    exponential backoff, honouring Retry-After. Returns the final response
+    (callers still call raise_for_status; `response.retries` counts the retries)
+    or raises the last exception.
+    """
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for {breaker.host}, skipping request")
+
+    session = get_session()
+    for attempt in range(max_retries + 1):
+        try:
+            response = session.post(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries:
+                breaker.record_failure()
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+        except requests.RequestException:
+            # not retryable, but still settle the breaker (a half-open probe must not stay in flight)
+            breaker.record_failure()
+            raise
+
+        if response.status_code in RETRY_STATUSES:
+            if attempt < max_retries:
+                delay = retry_after_delay(response)
+                response.close()
+                time.sleep(min(HTTP_RETRY_AFTER_MAX, delay) if delay is not None else backoff_delay(attempt))
+                continue
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        response.retries = attempt
+        return response
@@ -0,0 +1,132 @@
+# newsletter/images.py
+
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from dotenv import load_dotenv
+
+from newsletter import http_client
+from newsletter.cache import DiskCache, content_key
+
+load_dotenv()
+
+IMAGE_PROBE_TIMEOUT = float(os.getenv("IMAGE_PROBE_TIMEOUT", "5"))
+IMAGE_CACHE_TTL = float(os.getenv("IMAGE_CACHE_TTL", str(7 * 24 * 3600)))
+IMAGE_MIN_WIDTH = int(os.getenv("IMAGE_MIN_WIDTH", "200"))
+
+# Enough of the file to read the dimensions from any common header
+PROBE_BYTES = 64 * 1024
+
+image_cache = DiskCache("images", ttl=IMAGE_CACHE_TTL, max_bytes=5 * 1024 * 1024)
+
+
+def sniff_dimensions(data):
+    """(width, height) from the first bytes of a PNG, GIF, JPEG or WebP file, else None"""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+        return None
+
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                i += 1 if marker == 0xFF else 2
+                continue
+            length = struct.unpack(">H", data[i + 2:i + 4])[0]
+            # SOFn frames (excluding DHT/JPG/DAC) carry the dimensions
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return width, height
+            i += 2 + length
+    return None
+
+
+def probe_image(url):
+    """
+    Check an image URL with a ranged GET and a short timeout.
+    Returns {"ok": True/False/None, "content_type", "width", "height"}; ok is None
+    when the probe itself failed (network error), which is not cached.
+    """
+    if not url or not url.startswith(("http://", "https://")):
+        return {"ok": False, "content_type": None, "width": None, "height": None}
+
+    key = content_key({"image_url": url})
+    cached = image_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        resp = http_client.get_session().get(
+            url,
+            headers={"Range": f"bytes=0-{PROBE_BYTES - 1}"},
+            timeout=IMAGE_PROBE_TIMEOUT,
+            stream=True,
+            allow_redirects=True,
+        )
+        try:
+            data = b""
+            if resp.status_code in (200, 206):
+                for chunk in resp.iter_content(8192):
+                    data += chunk
+                    if len(data) >= PROBE_BYTES:
+                        break
+        finally:
+            resp.close()
+    except requests.RequestException as e:
+        print(f"   ⚠️ Image probe failed for {url}: {e}")
+        return {"ok": None, "content_type": None, "width": None, "height": None}
+
+    content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+    dimensions = sniff_dimensions(data) if data else None
+    width, height = dimensions if dimensions else (None, None)
+    ok = (
+        resp.status_code in (200, 206)
+        and content_type.startswith("image/")
+        and (width is None or width >= IMAGE_MIN_WIDTH)
+    )
+    result = {"ok": ok, "content_type": content_type or None, "width": width, "height": height}
+    image_cache.set(key, result, meta={"url": url, "status": resp.status_code})
+    return result
+
+
+def resolve_image(candidates):
+    """
+    Probe candidate image URLs concurrently and return the first valid one in
+    priority order. If no candidate could be checked at all (e.g. offline), the
+    first candidate is returned unverified; if all were checked and rejected, None.
+    """
+    candidates = list(dict.fromkeys(c for c in candidates if c))
+    if not candidates:
+        return None
+
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    futures = [executor.submit(probe_image, url) for url in candidates]
+    try:
+        any_checked = False
+        for url, future in zip(candidates, futures):
+            result = future.result()
+            if result["ok"]:
+                return url
+            any_checked = any_checked or result["ok"] is False
+        return None if any_checked else candidates[0]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,249 @@
+# newsletter/llm_router.py
+
+import os
+import json
+import time
+import threading
+from urllib.parse import urlparse
+import requests
+from dotenv import load_dotenv
+
+from newsletter import http_client
+from newsletter.ratelimit import RateLimiter
+
+load_dotenv()
+
+# Extra OpenAI-compatible backends, tried alongside the primary one. JSON list, e.g.
+# [{"name": "openai", "url": "https://api.openai.com/v1/chat/completions",
+#   "model": "gpt-4o-mini", "api_key_env": "OPENAI_API_KEY", "rpm": 500, "tpm": 200000}]
+LLM_PROVIDERS = os.getenv("LLM_PROVIDERS", "")
+
+LLM_EWMA_ALPHA = float(os.getenv("LLM_EWMA_ALPHA", "0.3"))
+LLM_ERROR_THRESHOLD = float(os.getenv("LLM_ERROR_THRESHOLD", "0.5"))
+LLM_UNHEALTHY_COOLDOWN = float(os.getenv("LLM_UNHEALTHY_COOLDOWN", "120"))
+
+STREAM_METRICS = {}  # label -> {"ttft", "tokens", "tokens_per_sec", "cut_off", "backend"}
+
+
+class LLMBackend:
+    """One OpenAI-compatible chat completions endpoint + model, with EWMA latency/error stats"""
+
+    def __init__(self, name, url, model, api_key, limiter=None):
+        self.name = name
+        self.url = url
+        self.model = model
+        self.api_key = api_key
+        self.limiter = limiter
+        self.latency = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.last_error_at = None
+        self._lock = threading.Lock()
+
+    def record_success(self, latency):
+        with self._lock:
+            self.calls += 1
+            self.latency = latency if self.latency is None else (
+                LLM_EWMA_ALPHA * latency + (1 - LLM_EWMA_ALPHA) * self.latency
+            )
+            self.error_rate *= (1 - LLM_EWMA_ALPHA)
+
+    def record_failure(self, latency=None):
+        with self._lock:
+            self.calls += 1
+            self.last_error_at = time.monotonic()
+            self.error_rate = LLM_EWMA_ALPHA + (1 - LLM_EWMA_ALPHA) * self.error_rate
+            if latency is not None:
+                # a slow failure still tells us the backend is slow
+                self.latency = latency if self.latency is None else max(self.latency, latency)
+
+    def is_healthy(self):
+        """Below the error threshold, or unhealthy long enough ago to deserve a probe"""
+        if self.error_rate < LLM_ERROR_THRESHOLD:
+            return not http_client.get_breaker(self.url).is_open()
+        return time.monotonic() - (self.last_error_at or 0) >= LLM_UNHEALTHY_COOLDOWN
+
+    def expected_latency(self):
+        # untried backends sort first so every backend gets measured
+        return 0.0 if self.latency is None else self.latency
+
+    def __repr__(self):
+        return f"<LLMBackend {self.name}:{self.model}>"
+
+
+def load_backends(primary=None):
+    """Primary backend (if it has a key) followed by any configured in LLM_PROVIDERS"""
+    backends = [primary] if primary and primary.api_key else []
+    if not LLM_PROVIDERS.strip():
+        return backends
+
+    try:
+        providers = json.loads(LLM_PROVIDERS)
+    except ValueError as e:
+        print(f"⚠️ Ignoring LLM_PROVIDERS (invalid JSON): {e}")
+        return backends
+
+    for provider in providers:
+        api_key = os.getenv(provider.get("api_key_env", ""), provider.get("api_key"))
+        if not provider.get("url") or not provider.get("model") or not api_key:
+            print(f"⚠️ Skipping LLM provider without url/model/API key: {provider.get('name')}")
+            continue
+        limiter = None
+        if provider.get("rpm") and provider.get("tpm"):
+            limiter = RateLimiter(provider["rpm"], provider["tpm"])
+        backends.append(LLMBackend(
+            provider.get("name") or urlparse(provider["url"]).netloc,
+            provider["url"], provider["model"], api_key, limiter,
+        ))
+    return backends
+
+
+class LLMRouter:
+    """
+    Routes each chat completion to the fastest healthy backend (lowest EWMA
+    latency) and fails over to the next one, within the same call, on errors.
+    """
+
+    def __init__(self, backends):
+        self.backends = list(backends)
+
+    def ordered(self):
+        return sorted(self.backends, key=lambda b: (not b.is_healthy(), b.expected_latency()))
+
+    def chat(self, messages, max_tokens, temperature, label, deadline,
+             request_tokens=0, stream=False, stop_when=None):
+        """
+        Returns (reply_text, backend, info), with reply and backend None if every
+        backend failed or the deadline (seconds, including rate-limit waits) ran out.
+        info has the call's "latency", "ttft", "usage" (the API's token counts, if
+        reported) and "retries" (HTTP retries plus failovers).
+        """
+        started = time.monotonic()
+        info = {"latency": 0.0, "ttft": None, "usage": None, "retries": 0}
+        candidates = self.ordered()
+        for position, backend in enumerate(candidates):
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                print(f"⏱️ LLM deadline passed for {label}")
+                break
+            if backend.limiter and not backend.limiter.acquire(request_tokens, timeout=remaining):
+                print(f"⏱️ {backend.name} rate limit: no capacity for {label} within {remaining:.0f}s")
+                continue
+
+            remaining = max(1.0, deadline - (time.monotonic() - started))
+            is_last = position == len(candidates) - 1
+            if position > 0:
+                info["retries"] += 1
+            call_started = time.monotonic()
+            try:
+                reply, usage, ttft, retries = self._complete(
+                    backend, messages, max_tokens, temperature, label, remaining,
+                    stream, stop_when,
+                    # retrying the same backend only makes sense when there's nowhere to fail over to
+                    max_retries=http_client.HTTP_MAX_RETRIES if is_last else 0,
+                )
+            except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+                backend.record_failure(time.monotonic() - call_started)
+                info["latency"] = time.monotonic() - started
+                kind = "timeout" if isinstance(e, requests.Timeout) else "error"
+                print(f"❌ {backend.name} {kind} for {label}: {e}" + ("" if is_last else ", failing over"))
+                continue
+
+            backend.record_success(time.monotonic() - call_started)
+            info.update(latency=time.monotonic() - started, ttft=ttft, usage=usage)
+            info["retries"] += retries
+            return reply, backend, info
+        return None, None, info
+
+    def _complete(self, backend, messages, max_tokens, temperature, label, timeout,
+                  stream, stop_when, max_retries):
+        """(reply_text, usage, ttft, http_retries) from one backend; raises on failure"""
+        headers = {
+            "Authorization": f"Bearer {backend.api_key}",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "model": backend.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": stream,
+        }
+        requested = time.monotonic()
+        response = http_client.post(
+            backend.url, max_retries=max_retries, headers=headers, json=payload,
+            timeout=min(20, timeout), stream=stream,
+        )
+        response.raise_for_status()
+        retries = getattr(response, "retries", 0)
+        if stream:
+            reply, usage, ttft = read_stream(response, label, requested + timeout, stop_when, backend.name, requested)
+            return reply, usage, ttft, retries
+        body = response.json()
+        return body["choices"][0]["message"]["content"].strip(), body.get("usage"), None, retries
+
+
+def read_stream(response, label, stop_at, stop_when=None, backend_name=None, requested=None):
+    """
+    Assemble a streamed (SSE) completion, recording time-to-first-token (since
+    `requested`, monotonic) and tokens/sec for `label`. `stop_when(partial_text)`
+    returns how much of the text to keep once the reply is complete (0 until then):
+    the connection is closed early and anything after that point is dropped.
+    Raises requests.Timeout if the stream outlives `stop_at`.
+    Returns (reply_text, usage or None, ttft or None).
+    """
+    requested = time.monotonic() if requested is None else requested
+    first_token_at = None
+    parts = []
+    chunks = 0
+    usage = None
+    cut_off = False
+
+    try:
+        for line in response.iter_lines(decode_unicode=True):
+            if time.monotonic() > stop_at:
+                raise requests.Timeout(f"stream for {label} passed its deadline")
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+
+            event = json.loads(data)
+            usage = (event.get("x_groq") or {}).get("usage") or event.get("usage") or usage
+            if not event.get("choices"):
+                continue
+            delta = event["choices"][0].get("delta", {}).get("content")
+            if not delta:
+                continue
+
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            parts.append(delta)
+            chunks += 1
+            if stop_when:
+                text = "".join(parts)
+                keep = stop_when(text)
+                if keep:
+                    parts = [text[:keep]]
+                    cut_off = True
+                    break
+    finally:
+        response.close()
+
+    finished = time.monotonic()
+    tokens = (usage or {}).get("completion_tokens") or chunks
+    ttft = None
+    if first_token_at is not None:
+        ttft = round(first_token_at - requested, 3)
+        generating = max(finished - first_token_at, 1e-3)
+        STREAM_METRICS[label] = {
+            "ttft": ttft,
+            "tokens": tokens,
+            "tokens_per_sec": round(tokens / generating, 1),
+            "cut_off": cut_off,
+            "backend": backend_name,
+        }
+        print(f"   ⚡ {label} via {backend_name}: first token {first_token_at - requested:.2f}s, "
+              f"{tokens / generating:.0f} tok/s{' (cut off after last section)' if cut_off else ''}")
+    return "".join(parts).strip(), usage, ttft
@@ -1,77 +1,222 @@
 # newsletter/pipeline.py
 
 import os
-import shutil
 import re
-import base64
+import shutil
+import time
 import urllib.parse
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
+from concurrent.futures import ThreadPoolExecutor, wait
 from premailer import Premailer
 from dotenv import load_dotenv
 
-from newsletter.fetcher import fetch_articles
-from newsletter.summarizer import summarize_with_groq
+from newsletter.fetcher import stream_articles, count_articles, print_content_summary, FETCH_DEADLINE
+from newsletter.summarizer import (
+    summarize_with_groq, summarize_hedged, summarize_batch, fallback_summary,
+    SUMMARY_CACHE_STATS, SUMMARY_DEADLINE, SUMMARY_BATCH, SUMMARY_HEDGE
+)
 from newsletter.emailer import send_email
-from newsletter.database import save_newsletter, log_newsletter_sent, init_db
+from newsletter.assets import asset_cid_reference
+from newsletter.templates import get_inlined_template, needs_css_inlining
+from newsletter.html_transform import (
+    transform_html, parse_declarations, YouTubeThumbnailVisitor, AssetRewriteVisitor, LinkTaggingVisitor,
+    CSSInlineVisitor
+)
+from newsletter.database import (
+    save_newsletter, reserve_newsletter_id, log_newsletter_sent, init_db, prune_summary_cache,
+    forget_archived_content
+)
+from newsletter.telemetry import llm_telemetry
+from newsletter import archive
 
 load_dotenv()
 
+# End-to-end budget (seconds) for fetching + summarizing before rendering starts
+PIPELINE_DEADLINE = float(os.getenv("PIPELINE_DEADLINE", "60"))
 
-def convert_image_to_base64(image_path):
-    """Convert local image to base64 for email embedding"""
-    try:
-        with open(image_path, 'rb') as img_file:
-            encoded = base64.b64encode(img_file.read()).decode('utf-8')
-            return f"data:image/jpeg;base64,{encoded}"
-    except Exception as e:
-        print(f"⚠️ Error converting image: {e}")
-        return None
+# Gmail clips messages whose HTML is over ~102 KB; "warn" or "fail" when the budget is exceeded
+EMAIL_BYTE_BUDGET = int(os.getenv("EMAIL_BYTE_BUDGET", "102000"))
+EMAIL_BUDGET_MODE = os.getenv("EMAIL_BUDGET_MODE", "warn").lower()
 
+# Query parameters added to outbound article links, e.g. "utm_source=newsletter&utm_medium=email"
+LINK_TAG_PARAMS = dict(urllib.parse.parse_qsl(os.getenv("LINK_TAG_PARAMS", "")))
 
-def embed_local_images(html_content):
-    """Convert local image paths to base64 for email compatibility"""
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    assets_path = os.path.join(project_root, 'newsletter', 'assets', 'vbit_logo.jpg')
-    
-    if os.path.exists(assets_path):
-        base64_img = convert_image_to_base64(assets_path)
-        if base64_img:
-            html_content = html_content.replace('../assets/vbit_logo.jpg', base64_img)
-            html_content = html_content.replace('assets/vbit_logo.jpg', base64_img)
-    
+
+def postprocess_html(html_content, skip_link_prefixes=()):
+    """
+    Email post-processing in a single parse/serialize pass: YouTube players become
+    thumbnails, bundled assets become cid: references (attached by send_email),
+    outbound links are tagged (LINK_TAG_PARAMS) and any remaining <style> rules
+    are inlined. If the stylesheet has selectors the built-in inliner can't
+    handle, premailer inlines the whole stylesheet instead.
+    """
+    visitors = [YouTubeThumbnailVisitor(), AssetRewriteVisitor(asset_cid_reference)]
+    if LINK_TAG_PARAMS:
+        visitors.append(LinkTaggingVisitor(LINK_TAG_PARAMS, skip_link_prefixes))
+    css_inliner = None
+    if needs_css_inlining(html_content):
+        css_inliner = CSSInlineVisitor()
+        visitors.append(css_inliner)
+    
+    source = html_content
+    html_content = transform_html(source, visitors)
+    
+    if css_inliner and css_inliner.unsupported:
+        # Premailer ranks existing inline styles above every rule, so mixing the two
+        # inliners would break the cascade: redo the pass without ours, let premailer do it all
+        print(f"   🎨 Inlining CSS with premailer ({len(css_inliner.unsupported)} complex selectors)...")
+        html_content = transform_html(source, [v for v in visitors if v is not css_inliner])
+        try:
+            premailer = Premailer(html_content, strip_important=False)
+            html_content = premailer.transform()
+        except Exception as e:
+            print(f"   ⚠️ CSS inlining warning: {e}")
     return html_content
 
 
-def convert_youtube_iframes_to_thumbnails(html_content):
-    """ENHANCED: Replace YouTube iframe embeds with FULL-WIDTH clickable thumbnails"""
-    
-    # Pattern 1: Standard iframe embeds
-    iframe_pattern = r'<iframe[^>]*src=["\']https?://(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})[^"\']*["\'][^>]*>.*?</iframe>'
-    
-    def replace_with_thumbnail(match):
-        video_id = match.group(1)
-        return f'''
-        <a href="https://www.youtube.com/watch?v={video_id}" 
-           style="display: block; text-align: center; text-decoration: none; margin: 20px 0;">
-            <img src="https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg" 
-                 alt="YouTube Video" 
-                 style="max-width: 100%; height: auto; border-radius: 8px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-            <p style="margin-top: 12px; color: #667eea; font-weight: 600; font-size: 16px;">
-                ▶ Click to Watch on YouTube
-            </p>
-        </a>
-        '''
-    
-    html_content = re.sub(iframe_pattern, replace_with_thumbnail, html_content, flags=re.IGNORECASE | re.DOTALL)
-    
-    # Pattern 2: Handle embed URLs that might be in different formats
-    embed_link_pattern = r'<a[^>]*href=["\']https?://(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})[^"\']*["\'][^>]*>.*?</a>'
-    html_content = re.sub(embed_link_pattern, replace_with_thumbnail, html_content, flags=re.IGNORECASE | re.DOTALL)
-    
+# =====================================================
+# 📦 PAYLOAD OPTIMIZER
+# =====================================================
+# Comments, except Outlook conditional comments (<!--[if mso]> ... <![endif]-->)
+HTML_COMMENT_RE = re.compile(r"<!--(?!\[if)(?!<!\[endif)(?!\s*\[endif).*?-->", re.DOTALL)
+STYLE_ATTR_RE = re.compile(r'(\sstyle=)(["\'])(.*?)\2', re.IGNORECASE | re.DOTALL)
+CLASS_ATTR_RE = re.compile(r'\sclass=(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+STYLE_BLOCK_RE = re.compile(r"<style\b[^>]*>(.*?)</style>", re.IGNORECASE | re.DOTALL)
+RAW_TEXT_BLOCK_RE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2>)", re.IGNORECASE | re.DOTALL)
+# ASCII whitespace only: a literal U+00A0 (non-breaking space) must survive minification
+WHITESPACE_RE = re.compile(r"[ \t\n\r\f]+")
+
+
+def strip_comments(html_content):
+    return HTML_COMMENT_RE.sub("", html_content)
+
+
+def dedupe_inline_styles(html_content):
+    """Keep only the last (winning) value of each property in every style attribute"""
+    def dedupe(match):
+        declarations = parse_declarations(match.group(3))
+        if declarations is None:
+            return match.group(0)
+        css = ";".join(f"{name}:{value}" for name, value in declarations.items())
+        return f"{match.group(1)}{match.group(2)}{css}{match.group(2)}"
+    return STYLE_ATTR_RE.sub(dedupe, html_content)
+
+
+def strip_unused_classes(html_content):
+    """Drop class names no remaining <style> rule refers to (everything else is inlined)"""
+    stylesheet = " ".join(STYLE_BLOCK_RE.findall(html_content))
+    used = set(re.findall(r"\.(-?[_a-zA-Z][\w-]*)", stylesheet))
+    
+    def keep_used(match):
+        classes = [c for c in match.group(2).split() if c in used]
+        return f' class="{" ".join(classes)}"' if classes else ""
+    return CLASS_ATTR_RE.sub(keep_used, html_content)
+
+
+def collapse_whitespace(html_content):
+    """Collapse whitespace runs to one character (a newline if the run had one), outside raw-text elements"""
+    def collapse(text):
+        return WHITESPACE_RE.sub(lambda m: "\n" if "\n" in m.group(0) else " ", text)
+    
+    parts = RAW_TEXT_BLOCK_RE.split(html_content)
+    # split() with two groups yields: text, whole block, tag name, text, ...
+    return "".join(
+        collapse(part) if index % 3 == 0 else (part if index % 3 == 1 else "")
+        for index, part in enumerate(parts)
+    )
+
+
+PAYLOAD_STEPS = [
+    ("strip comments", strip_comments),
+    ("dedupe inline styles", dedupe_inline_styles),
+    ("strip unused classes", strip_unused_classes),
+    ("collapse whitespace", collapse_whitespace),
+]
+
+
+def optimize_payload(html_content, budget=EMAIL_BYTE_BUDGET, mode=EMAIL_BUDGET_MODE):
+    """
+    Shrink the email HTML step by step, reporting the size after each step, then
+    check it against the byte budget. Returns the optimized HTML, or None if it
+    is over budget and mode is "fail".
+    """
+    size = len(html_content.encode("utf-8"))
+    print(f"   📦 Payload: {size:,} bytes")
+    for name, step in PAYLOAD_STEPS:
+        html_content = step(html_content)
+        new_size = len(html_content.encode("utf-8"))
+        print(f"      {name}: {size:,} → {new_size:,} bytes ({new_size - size:+,})")
+        size = new_size
+    
+    if size > budget:
+        print(f"   {'❌' if mode == 'fail' else '⚠️'} Payload is {size:,} bytes, over the {budget:,}-byte budget "
+              f"(Gmail clips messages over ~102 KB)")
+        if mode == "fail":
+            return None
+    else:
+        print(f"   ✅ Payload within budget: {size:,} / {budget:,} bytes")
     return html_content
 
 
+def gather_newsletter_content(deadline=PIPELINE_DEADLINE):
+    """
+    Streaming fetch -> filter -> pick best -> summarize.
+    Each category's summary is started the moment its best article is picked, so a
+    slow search for one category doesn't hold up the others. Returns once every
+    slot is filled or the deadline passes; unfinished summaries get the local
+    extractive fallback (with SUMMARY_HEDGE, after each category's hedge deadline).
+    With SUMMARY_BATCH, summaries instead wait for the last category and go out
+    as a single request.
+    """
+    started = time.monotonic()
+    articles = {"development": None, "training": None, "research": None, "startup": None, "tools": []}
+    summarizer_pool = ThreadPoolExecutor(max_workers=4)
+    summaries = {}
+    
+    # FETCH_DEADLINE caps the fetch stage so late categories keep some time to summarize
+    for category, item in stream_articles(deadline=min(FETCH_DEADLINE, deadline)):
+        articles[category] = item
+        if category == "tools" or not item or not item.get("content") or SUMMARY_BATCH:
+            continue
+        remaining = deadline - (time.monotonic() - started)
+        print(f"   📝 Summarizing {category}...")
+        summarize = summarize_hedged if SUMMARY_HEDGE else summarize_with_groq
+        summaries[category] = summarizer_pool.submit(
+            summarize, item["content"], category, max(1.0, min(SUMMARY_DEADLINE, remaining))
+        )
+    
+    batch = []
+    if SUMMARY_BATCH:
+        batch = [c for c in ("development", "training", "research", "startup")
+                 if articles[c] and articles[c].get("content")]
+        if batch:
+            remaining = max(1.0, min(SUMMARY_DEADLINE, deadline - (time.monotonic() - started)))
+            batch_future = summarizer_pool.submit(
+                summarize_batch, [(articles[c]["content"], c) for c in batch], remaining
+            )
+            summaries = {c: batch_future for c in batch}
+    
+    remaining = max(0.0, deadline - (time.monotonic() - started))
+    done, _ = wait(set(summaries.values()), timeout=remaining)
+    summarizer_pool.shutdown(wait=False, cancel_futures=True)
+    
+    for category, future in summaries.items():
+        article = articles[category]
+        summary = future.result() if future in done else None
+        if summary and batch:
+            summary = summary[batch.index(category)]
+        if future not in done:
+            print(f"   ⏱️ Pipeline deadline passed before {category} summary finished")
+        article["summary"] = summary or fallback_summary(article["content"], category)
+    
+    count_articles(articles)
+    print_content_summary(articles)
+    print(f"   ⚡ Summary cache: {SUMMARY_CACHE_STATS['hits']} hits, {SUMMARY_CACHE_STATS['misses']} misses")
+    llm_telemetry.print_summary()
+    print(f"   ⏱️ Content ready in {time.monotonic() - started:.1f}s")
+    return articles
+
+
 def generate_newsletter():
     """
     Generate newsletter HTML from fetched articles
@@ -81,36 +226,21 @@ def generate_newsletter():
     
     # Initialize database
     init_db()
+    prune_summary_cache()
+    forget_archived_content(archive.prune())
+    llm_telemetry.reset()
     
-    # Fetch articles
-    print("\n📰 Fetching curated AI/ML content...")
-    articles = fetch_articles()
+    # Fetch + summarize, each category flowing through independently
+    print("\n📰 Fetching and summarizing curated AI/ML content...")
+    articles = gather_newsletter_content()
     
     if not articles or articles.get("total_articles", 0) == 0:
         print("❌ No articles fetched. Aborting newsletter generation.")
         return None, None
     
-    # Summarize articles
-    print("\n🤖 Generating AI summaries...")
-    for category in ["development", "training", "research", "startup"]:
-        article = articles.get(category)
-        if article and isinstance(article, dict):
-            content = article.get("content", "")
-            if content:
-                print(f"   📝 Summarizing {category}...")
-                summary = summarize_with_groq(content, category=category)
-                if summary:
-                    article["summary"] = summary
-                else:
-                    article["summary"] = f"<p>{content[:180]}...</p>"
-    
     # Render HTML template
     print("\n📄 Rendering newsletter template...")
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    template_dir = os.path.join(project_root, 'newsletter', 'templates')
-    
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template('newsletter.html')
+    template = get_inlined_template('newsletter.html')
     
     # Prepare template data
     now = datetime.now()
@@ -123,18 +253,15 @@ def generate_newsletter():
     else:
         time_of_day = "Evening"
     
-    # Save newsletter to database FIRST to get newsletter_id
-    print("\n💾 Saving to database...")
-    newsletter_id = save_newsletter(
-        title='Weekly AI & ML Insights',
-        content_html="<p>Generating...</p>",  # Temporary content
-        created_by_email="system@vbit.edu"
-    )
+    # Reserve the newsletter_id the feedback links need; the row is written once, at the end
+    print("\n💾 Reserving newsletter ID...")
+    newsletter_id = reserve_newsletter_id()
+    persist = newsletter_id is not None
     
-    if newsletter_id:
+    if persist:
         print(f"   ✅ Newsletter ID: {newsletter_id}")
     else:
-        print("   ⚠️ Could not save to database, using ID 1")
+        print("   ⚠️ Could not reach the database, using ID 1")
         newsletter_id = 1
     
     # Generate feedback URLs with newsletter_id and recipient_email
@@ -164,52 +291,47 @@ def generate_newsletter():
     
     html_content = template.render(**template_data)
     
-    # Convert YouTube iframes to thumbnails
-    print("   🎥 Converting YouTube embeds...")
-    html_content = convert_youtube_iframes_to_thumbnails(html_content)
-    
-    # Embed local images
-    print("   🖼️ Embedding local images...")
-    html_content = embed_local_images(html_content)
-    
-    # Inline CSS for email compatibility
-    print("   🎨 Inlining CSS...")
-    try:
-        premailer = Premailer(html_content, strip_important=False)
-        html_content = premailer.transform()
-    except Exception as e:
-        print(f"   ⚠️ CSS inlining warning: {e}")
-    
-    # Save to output directory
-    output_dir = os.path.join(project_root, 'newsletter', 'output')
-    os.makedirs(output_dir, exist_ok=True)
-    
-    timestamp = now.strftime('%Y%m%d_%H%M%S')
-    output_path = os.path.join(output_dir, f'newsletter_{timestamp}.html')
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"   ✅ Newsletter saved: {output_path}")
-    
-    # Update newsletter in database with actual HTML content
-    try:
-        from newsletter.database import SessionLocal, Newsletter
-        session = SessionLocal()
-        newsletter = session.query(Newsletter).filter_by(newsletter_id=newsletter_id).first()
-        if newsletter:
-            newsletter.content_html = html_content
-            session.commit()
-            print(f"   ✅ Database updated with final HTML")
-        session.close()
-    except Exception as e:
-        print(f"   ⚠️ Could not update database: {e}")
+    # YouTube thumbnails, embedded assets, link tagging and CSS inlining in one pass
+    print("   🔧 Post-processing HTML...")
+    html_content = postprocess_html(
+        html_content,
+        skip_link_prefixes=[base_feedback_url, template_data['unsubscribe_url'], template_data['preferences_url']]
+    )
+    
+    # Minify and check the size against Gmail's clipping threshold
+    print("   📉 Optimizing payload...")
+    html_content = optimize_payload(html_content)
+    if html_content is None:
+        print("❌ Newsletter exceeds the email size budget. Aborting newsletter generation.")
+        return None, None
+    
+    # Keep the issue once, compressed in the content-addressed archive
+    content_hash, content_size = archive.store(html_content)
+    
+    # Final HTML, published articles and telemetry in one transaction;
+    # only an id that was actually saved is returned, so nothing logs against a missing row
+    saved_id = None
+    if persist:
+        print("\n💾 Saving to database...")
+        saved_id = save_newsletter(
+            title='Weekly AI & ML Insights',
+            # the DB row only points at the archive; fall back to inline HTML if archiving failed
+            content_html=None if content_hash else html_content,
+            content_hash=content_hash,
+            content_size=content_size,
+            created_by_email="system@vbit.edu",
+            newsletter_id=newsletter_id,
+            articles=[articles.get(category) for category in ["development", "training", "research", "startup"]],
+            telemetry=llm_telemetry.summary()
+        )
+        if not saved_id:
+            print("   ⚠️ Could not save to database")
     
     print("\n" + "=" * 60)
     print("✅ Newsletter generation complete!")
     print(f"📧 Feedback URL: {feedback_url}&rating=5")  # Example with 5 stars
     
-    return html_content, newsletter_id
+    return html_content, saved_id
 
 
 def send_newsletter():
@@ -237,7 +359,9 @@ def send_newsletter():
     subject = f"🤖 AI Newsletter - {datetime.now().strftime('%B %d, %Y')}"
     success = send_email(html_content, subject)
     
-    if success and newsletter_id:
+    if success and not newsletter_id:
+        print("✅ Newsletter sent (not recorded: the issue was not saved to the database)")
+    elif success:
         recipient_emails = [email.strip() for email in os.getenv("RECIPIENT_EMAIL", "").split(",") if email.strip()]
         try:
             log_newsletter_sent(
@@ -0,0 +1,50 @@
+# newsletter/ratelimit.py
+
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for APIs with both requests-per-minute and
+    tokens-per-minute quotas (e.g. Groq). Both buckets start full and refill
+    continuously; a call proceeds only when both have room.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.rpm = float(requests_per_minute)
+        self.tpm = float(tokens_per_minute)
+        self.request_allowance = self.rpm
+        self.token_allowance = self.tpm
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.request_allowance = min(self.rpm, self.request_allowance + elapsed * self.rpm / 60)
+        self.token_allowance = min(self.tpm, self.token_allowance + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens, timeout=None):
+        """
+        Block until one request and `tokens` tokens are available.
+        Returns False (taking nothing) if that would take longer than `timeout` seconds.
+        """
+        tokens = min(float(tokens), self.tpm)  # an oversized call still gets through once the bucket is full
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                request_wait = max(0.0, (1 - self.request_allowance) * 60 / self.rpm)
+                token_wait = max(0.0, (tokens - self.token_allowance) * 60 / self.tpm)
+                wait = max(request_wait, token_wait)
+                if wait == 0:
+                    self.request_allowance -= 1
+                    self.token_allowance -= tokens
+                    return True
+
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
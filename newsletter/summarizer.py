@@ -1,189 +1,449 @@
 # newsletter/summarizer.py
 
 import os
-import requests
+import re
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, TimeoutError as FuturesTimeout
 from dotenv import load_dotenv
 
+from newsletter.cache import content_key
+from newsletter.extractive import compress_text, estimate_tokens, structured_summary
+from newsletter.ratelimit import RateLimiter
+from newsletter.llm_router import LLMRouter, LLMBackend, load_backends
+from newsletter.telemetry import llm_telemetry
+from newsletter.database import get_cached_summary, save_cached_summary
+
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = "llama-3.1-8b-instant"
+GROQ_TEMPERATURE = 0.7
+
+# Groq quotas for the model (free tier defaults) and per-summary deadline in seconds
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = int(os.getenv("GROQ_TPM", "6000"))
+SUMMARY_DEADLINE = float(os.getenv("SUMMARY_DEADLINE", "25"))
+
+# Hedging: the local summary is used unless Groq answers within this many seconds
+SUMMARY_HEDGE = os.getenv("SUMMARY_HEDGE", "true").lower() == "true"
+SUMMARY_HEDGE_DEADLINE = float(os.getenv("SUMMARY_HEDGE_DEADLINE", "8"))
+
+# Streaming: consume tokens as they arrive and stop once every section is written
+SUMMARY_STREAM = os.getenv("SUMMARY_STREAM", "true").lower() == "true"
+SECTION_CLOSE_RE = re.compile(r"</(?:p|ul)>")
+
+# Batch mode: summarize all of an issue's articles in one request instead of one each
+SUMMARY_BATCH = os.getenv("SUMMARY_BATCH", "false").lower() == "true"
+# Share of the deadline the batch request may use; the rest is left for per-article retries
+SUMMARY_BATCH_SHARE = float(os.getenv("SUMMARY_BATCH_SHARE", "0.6"))
+
+groq_limiter = RateLimiter(GROQ_RPM, GROQ_TPM)
+llm_router = LLMRouter(load_backends(primary=LLMBackend("groq", GROQ_URL, GROQ_MODEL, GROQ_API_KEY, groq_limiter)))
+
+# Summary cache: identical content + prompt + model settings skips the Groq call
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE", "true").lower() == "true"
+SUMMARY_CACHE_STATS = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+SYSTEM_PROMPT = (
+    "You are an expert in Generative AI, Large Language Models, AI Agents, and Deep Learning. "
+    "Write STRUCTURED summaries with HTML formatting (use <strong> for bold, <ul><li> for bullet points, <p> for paragraphs). "
+    "Use proper terminology (transformers, embeddings, RAG, fine-tuning, RLHF, chain-of-thought). "
+    "Follow the exact HTML format requested with proper tags. "
+    "Do NOT add any meta-commentary like 'here is' or 'summary:'. Return ONLY valid HTML."
+)
+
+# UPDATED: Structured prompts that request HTML output
+SUMMARY_PROMPTS = {
+    "development": {
+        "prompt": (
+            "You are a GenAI & LLM expert newsletter writer. Create a STRUCTURED summary with this exact HTML format:\n\n"
+            "<p><strong>🚀 What's New</strong><br>\n"
+            "Write 1-2 sentences about the breakthrough/announcement.</p>\n\n"
+            "<p><strong>💡 Key Highlights</strong></p>\n"
+            "<ul>\n"
+            "<li>First major feature or innovation</li>\n"
+            "<li>Second major feature or innovation</li>\n"
+            "<li>Third major feature or innovation</li>\n"
+            "</ul>\n\n"
+            "<p><strong>🎯 Why It Matters</strong><br>\n"
+            "Write 1-2 sentences about real-world impact and significance for AI developers.</p>\n\n"
+            "Use technical terms like 'transformer', 'RAG', 'multimodal', 'fine-tuning', 'agent' when relevant. "
+            "Return ONLY the HTML formatted summary without any meta-commentary:\n\n"
+        ),
+        "tokens": 350,
+        "input_tokens": 700
+    },
+    "training": {
+        "prompt": (
+            "Summarize this LLM/GenAI training resource with this STRUCTURED HTML format:\n\n"
+            "<p><strong>📚 What You'll Learn</strong><br>\n"
+            "Write 1-2 sentences about the main topics (LLM training, fine-tuning, agents, etc.).</p>\n\n"
+            "<p><strong>🎓 Key Topics</strong></p>\n"
+            "<ul>\n"
+            "<li>First major topic covered</li>\n"
+            "<li>Second major topic covered</li>\n"
+            "<li>Third major topic covered</li>\n"
+            "</ul>\n\n"
+            "<p><strong>👥 Best For</strong><br>\n"
+            "Write 1 sentence about target audience (developers/researchers/students) and skill level.</p>\n\n"
+            "Return ONLY the HTML formatted summary:\n\n"
+        ),
+        "tokens": 320,
+        "input_tokens": 600
+    },
+    "research": {
+        "prompt": (
+            "Summarize this LLM/GenAI research paper with this STRUCTURED HTML format:\n\n"
+            "<p><strong>🔬 Research Focus</strong><br>\n"
+            "Write 1-2 sentences about the research question (transformers, reasoning, agents, etc.).</p>\n\n"
+            "<p><strong>⚙️ Key Contributions</strong></p>\n"
+            "<ul>\n"
+            "<li>Novel methodology or architecture</li>\n"
+            "<li>Main experimental findings</li>\n"
+            "<li>Performance benchmarks or improvements</li>\n"
+            "</ul>\n\n"
+            "<p><strong>📊 Impact</strong><br>\n"
+            "Write 1-2 sentences about significance for the AI/ML field.</p>\n\n"
+            "Use technical language. Return ONLY the HTML formatted summary:\n\n"
+        ),
+        "tokens": 350,
+        "input_tokens": 800
+    },
+    "startup": {
+        "prompt": (
+            "Summarize this GenAI/LLM startup or tool with this STRUCTURED HTML format:\n\n"
+            "<p><strong>🏢 What They Built</strong><br>\n"
+            "Write 1-2 sentences about their product (LLM platform, agent framework, vector DB, etc.).</p>\n\n"
+            "<p><strong>✨ Key Features</strong></p>\n"
+            "<ul>\n"
+            "<li>First major feature or capability</li>\n"
+            "<li>Second major feature or capability</li>\n"
+            "<li>Third major feature or capability</li>\n"
+            "</ul>\n\n"
+            "<p><strong>💼 Use Cases</strong><br>\n"
+            "Write 1 sentence about primary applications and target market.</p>\n\n"
+            "Return ONLY the HTML formatted summary:\n\n"
+        ),
+        "tokens": 320,
+        "input_tokens": 600
+    },
+    "tool": {
+        "prompt": (
+            "Describe this GenAI/LLM tool in exactly 2-3 sentences. "
+            "Explain: (1) What it does (LangChain, vector DB, agent framework, etc.), "
+            "(2) Key features for LLM developers, (3) Primary use case. "
+            "Be concise and technical. Return as a single paragraph:\n\n"
+        ),
+        "tokens": 120,
+        "input_tokens": 250
+    },
+    "featured": {
+        "prompt": (
+            "You are a GenAI expert. Summarize this AI breakthrough with this STRUCTURED HTML format:\n\n"
+            "<p><strong>🚀 What Happened</strong><br>\n"
+            "Write 1-2 sentences about the breakthrough.</p>\n\n"
+            "<p><strong>💡 Key Details</strong></p>\n"
+            "<ul>\n"
+            "<li>First major point</li>\n"
+            "<li>Second major point</li>\n"
+            "<li>Third major point</li>\n"
+            "</ul>\n\n"
+            "<p><strong>🎯 Impact</strong><br>\n"
+            "Write 1-2 sentences about significance for the AI field.</p>\n\n"
+            "Return ONLY the HTML formatted summary:\n\n"
+        ),
+        "tokens": 320,
+        "input_tokens": 700
+    }
+}
+
+
+def summary_cache_key(text, prompt, max_tokens, category, backend):
+    """Hash of everything that determines the LLM output for an article, including the backend that wrote it"""
+    return content_key({
+        "content_sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "category": category,
+        "system_prompt": SYSTEM_PROMPT,
+        "prompt": prompt,
+        "backend": backend.name,
+        "model": backend.model,
+        "temperature": GROQ_TEMPERATURE,
+        "max_tokens": max_tokens,
+    })
+
+
+def lookup_cached_summary(text, prompt, max_tokens, category):
+    """
+    Cached summary written by any configured backend (the routing order decides
+    which one wins when several have one), or None. Counts the hit or miss.
+    """
+    for backend in llm_router.ordered():
+        cached = get_cached_summary(summary_cache_key(text, prompt, max_tokens, category, backend))
+        if cached:
+            _count_cache("hits")
+            llm_telemetry.record(category, model=backend.model, backend=backend.name, cache_hit=True)
+            print(f"   ⚡ Summary cache hit for {category} ({backend.name})")
+            return cached
+    _count_cache("misses")
+    return None
+
+
+def input_token_budget(category):
+    """Article token budget for a category: SUMMARY_INPUT_TOKENS_<CATEGORY> env, else the prompt default"""
+    config = SUMMARY_PROMPTS.get(category, SUMMARY_PROMPTS["development"])
+    return int(os.getenv(f"SUMMARY_INPUT_TOKENS_{category.upper()}", config["input_tokens"]))
+
+
+def prepare_article_text(text, category):
+    """Extractively compress article text to its category's input budget before the LLM call"""
+    budget = input_token_budget(category)
+    compressed = compress_text(text, budget)
+    if compressed != text:
+        print(f"   ✂️ {category}: article cut from ~{estimate_tokens(text)} to ~{estimate_tokens(compressed)} tokens")
+    return compressed
+
+
+def _count_cache(outcome):
+    with _stats_lock:
+        SUMMARY_CACHE_STATS[outcome] += 1
 
-def summarize_with_groq(text: str, category: str = "story") -> str | None:
+
+def summarize_with_groq(text: str, category: str = "story", deadline: float = SUMMARY_DEADLINE,
+                        lookup_cache: bool = True) -> str | None:
     """
     ENHANCED: Generate STRUCTURED summaries with HTML formatting (side headings and bullet points)
+    `deadline` bounds the whole call in seconds, including any wait for rate-limit capacity.
+    Pass lookup_cache=False when the caller already missed the cache for this text.
     """
-    if not GROQ_API_KEY:
+    started = time.monotonic()
+    if not llm_router.backends:
         return f"{text[:150]}..."
     
-    # UPDATED: Structured prompts that request HTML output
-    prompts = {
-        "development": {
-            "prompt": (
-                "You are a GenAI & LLM expert newsletter writer. Create a STRUCTURED summary with this exact HTML format:\n\n"
-                "<p><strong>🚀 What's New</strong><br>\n"
-                "Write 1-2 sentences about the breakthrough/announcement.</p>\n\n"
-                "<p><strong>💡 Key Highlights</strong></p>\n"
-                "<ul>\n"
-                "<li>First major feature or innovation</li>\n"
-                "<li>Second major feature or innovation</li>\n"
-                "<li>Third major feature or innovation</li>\n"
-                "</ul>\n\n"
-                "<p><strong>🎯 Why It Matters</strong><br>\n"
-                "Write 1-2 sentences about real-world impact and significance for AI developers.</p>\n\n"
-                "Use technical terms like 'transformer', 'RAG', 'multimodal', 'fine-tuning', 'agent' when relevant. "
-                "Return ONLY the HTML formatted summary without any meta-commentary:\n\n"
-            ),
-            "tokens": 350
-        },
-        "training": {
-            "prompt": (
-                "Summarize this LLM/GenAI training resource with this STRUCTURED HTML format:\n\n"
-                "<p><strong>📚 What You'll Learn</strong><br>\n"
-                "Write 1-2 sentences about the main topics (LLM training, fine-tuning, agents, etc.).</p>\n\n"
-                "<p><strong>🎓 Key Topics</strong></p>\n"
-                "<ul>\n"
-                "<li>First major topic covered</li>\n"
-                "<li>Second major topic covered</li>\n"
-                "<li>Third major topic covered</li>\n"
-                "</ul>\n\n"
-                "<p><strong>👥 Best For</strong><br>\n"
-                "Write 1 sentence about target audience (developers/researchers/students) and skill level.</p>\n\n"
-                "Return ONLY the HTML formatted summary:\n\n"
-            ),
-            "tokens": 320
-        },
-        "research": {
-            "prompt": (
-                "Summarize this LLM/GenAI research paper with this STRUCTURED HTML format:\n\n"
-                "<p><strong>🔬 Research Focus</strong><br>\n"
-                "Write 1-2 sentences about the research question (transformers, reasoning, agents, etc.).</p>\n\n"
-                "<p><strong>⚙️ Key Contributions</strong></p>\n"
-                "<ul>\n"
-                "<li>Novel methodology or architecture</li>\n"
-                "<li>Main experimental findings</li>\n"
-                "<li>Performance benchmarks or improvements</li>\n"
-                "</ul>\n\n"
-                "<p><strong>📊 Impact</strong><br>\n"
-                "Write 1-2 sentences about significance for the AI/ML field.</p>\n\n"
-                "Use technical language. Return ONLY the HTML formatted summary:\n\n"
-            ),
-            "tokens": 350
-        },
-        "startup": {
-            "prompt": (
-                "Summarize this GenAI/LLM startup or tool with this STRUCTURED HTML format:\n\n"
-                "<p><strong>🏢 What They Built</strong><br>\n"
-                "Write 1-2 sentences about their product (LLM platform, agent framework, vector DB, etc.).</p>\n\n"
-                "<p><strong>✨ Key Features</strong></p>\n"
-                "<ul>\n"
-                "<li>First major feature or capability</li>\n"
-                "<li>Second major feature or capability</li>\n"
-                "<li>Third major feature or capability</li>\n"
-                "</ul>\n\n"
-                "<p><strong>💼 Use Cases</strong><br>\n"
-                "Write 1 sentence about primary applications and target market.</p>\n\n"
-                "Return ONLY the HTML formatted summary:\n\n"
-            ),
-            "tokens": 320
-        },
-        "tool": {
-            "prompt": (
-                "Describe this GenAI/LLM tool in exactly 2-3 sentences. "
-                "Explain: (1) What it does (LangChain, vector DB, agent framework, etc.), "
-                "(2) Key features for LLM developers, (3) Primary use case. "
-                "Be concise and technical. Return as a single paragraph:\n\n"
-            ),
-            "tokens": 120
-        },
-        "featured": {
-            "prompt": (
-                "You are a GenAI expert. Summarize this AI breakthrough with this STRUCTURED HTML format:\n\n"
-                "<p><strong>🚀 What Happened</strong><br>\n"
-                "Write 1-2 sentences about the breakthrough.</p>\n\n"
-                "<p><strong>💡 Key Details</strong></p>\n"
-                "<ul>\n"
-                "<li>First major point</li>\n"
-                "<li>Second major point</li>\n"
-                "<li>Third major point</li>\n"
-                "</ul>\n\n"
-                "<p><strong>🎯 Impact</strong><br>\n"
-                "Write 1-2 sentences about significance for the AI field.</p>\n\n"
-                "Return ONLY the HTML formatted summary:\n\n"
-            ),
-            "tokens": 320
-        }
-    }
-    
     # Use category-specific prompt or default to 'development'
-    config = prompts.get(category, prompts["development"])
+    config = SUMMARY_PROMPTS.get(category, SUMMARY_PROMPTS["development"])
+    text = prepare_article_text(text, category)
     prompt = config["prompt"] + text
     max_tokens = config["tokens"]
     
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json",
-    }
+    if SUMMARY_CACHE_ENABLED and lookup_cache:
+        cached = lookup_cached_summary(text, config["prompt"], max_tokens, category)
+        if cached:
+            return cached
     
-    payload = {
-        "model": "llama-3.1-8b-instant",
-        "messages": [
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert in Generative AI, Large Language Models, AI Agents, and Deep Learning. "
-                    "Write STRUCTURED summaries with HTML formatting (use <strong> for bold, <ul><li> for bullet points, <p> for paragraphs). "
-                    "Use proper terminology (transformers, embeddings, RAG, fine-tuning, RLHF, chain-of-thought). "
-                    "Follow the exact HTML format requested with proper tags. "
-                    "Do NOT add any meta-commentary like 'here is' or 'summary:'. Return ONLY valid HTML."
-                )
-            },
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": max_tokens,
-        "stream": False,
-    }
+    summary, backend = llm_chat(
+        prompt, max_tokens, category, deadline - (time.monotonic() - started),
+        stop_when=lambda partial: sections_complete(partial, config["prompt"]),
+    )
+    if summary is None:
+        return None
     
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
-        response.raise_for_status()
-        summary = response.json()["choices"][0]["message"]["content"].strip()
-        
-        # Clean up unwanted prefixes and HTML artifacts
-        bad_prefixes = [
-            "here is", "here's", "summary:", "in summary",
-            "this article", "the article", "according to",
-            "the research", "researchers", "the text", "this text",
-            "sure", "certainly", "of course", "``````"
-        ]
-        
-        summary_lower = summary.lower()
-        for bp in bad_prefixes:
-            if summary_lower.startswith(bp):
-                summary = summary[len(bp):].lstrip(" :-.,")
-                break
-        
-        # Remove code block markers if present
-        summary = summary.replace("``````", "").strip()
-        
-        # Ensure proper HTML structure
-        summary = ensure_html_formatting(summary)
+    summary = clean_summary(summary)
+    if SUMMARY_CACHE_ENABLED:
+        cache_key = summary_cache_key(text, config["prompt"], max_tokens, category, backend)
+        save_cached_summary(cache_key, category, backend.model, summary)
+    return summary
+
+
+def llm_chat(prompt, max_tokens, label, deadline, stop_when=None):
+    """
+    One chat completion routed to the fastest healthy backend (Groq plus any
+    LLM_PROVIDERS), failing over on errors. Returns (reply_text, backend) or
+    (None, None). `deadline` bounds rate-limit waits plus the requests. With
+    SUMMARY_STREAM the reply is read token by token and `stop_when(partial_text)`
+    can end it early (see read_stream).
+    """
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    # Quota needed per request: prompt plus completion tokens
+    prompt_tokens = estimate_tokens(SYSTEM_PROMPT + prompt)
+    request_tokens = prompt_tokens + max_tokens
+    # Recorded up front so a call that outlives its caller (lost hedge) still counts
+    candidates = llm_router.ordered()
+    entry = llm_telemetry.start(
+        label,
+        model=candidates[0].model if candidates else None,
+        backend=candidates[0].name if candidates else None,
+        prompt_tokens=prompt_tokens,
+    )
+    reply, backend, info = llm_router.chat(
+        messages, max_tokens, GROQ_TEMPERATURE, label, max(0.0, deadline),
+        request_tokens=request_tokens, stream=SUMMARY_STREAM, stop_when=stop_when,
+    )
+    
+    usage = info["usage"] or {}
+    llm_telemetry.finish(
+        entry,
+        model=backend.model if backend else entry["model"],
+        backend=backend.name if backend else entry["backend"],
+        prompt_tokens=usage.get("prompt_tokens") or (prompt_tokens if reply else 0),
+        completion_tokens=usage.get("completion_tokens") or (estimate_tokens(reply) if reply else 0),
+        latency=info["latency"],
+        ttft=info["ttft"],
+        retries=info["retries"],
+        ok=reply is not None,
+    )
+    return reply, backend
+
+
+def sections_complete(partial, prompt):
+    """
+    Once a streamed summary contains every <strong> section heading of its
+    prompt, in order, and the last section has some text and a closing tag,
+    the length of the summary up to that closing tag; else 0.
+    """
+    headings = [re.sub(r"^\W+", "", h) for h in re.findall(r"<strong>(.*?)</strong>", prompt)]
+    if not headings:
+        return 0
+    position = 0
+    for heading in headings:
+        found = re.compile(re.escape(heading), re.IGNORECASE).search(partial, position)
+        if not found:
+            return 0
+        position = found.end()
+    
+    closing = SECTION_CLOSE_RE.search(partial, position)
+    if not closing:
+        return 0
+    last_section = re.sub(r"<[^>]+>", "", partial[position:closing.start()])
+    return closing.end() if len(last_section.strip(" *:\n")) >= 20 else 0
+
+
+def clean_summary(summary):
+    """Strip meta-commentary and code fences from an LLM reply and normalise it to HTML"""
+    bad_prefixes = [
+        "here is", "here's", "summary:", "in summary",
+        "this article", "the article", "according to",
+        "the research", "researchers", "the text", "this text",
+        "sure", "certainly", "of course", "``````"
+    ]
+    
+    summary = summary.strip()
+    summary_lower = summary.lower()
+    for bp in bad_prefixes:
+        if summary_lower.startswith(bp):
+            summary = summary[len(bp):].lstrip(" :-.,")
+            break
+    
+    # Remove code block markers if present
+    summary = summary.replace("``````", "").strip()
+    
+    # Ensure proper HTML structure
+    return ensure_html_formatting(summary)
+
+
+# =====================================================
+# 📦 BATCH MODE: several articles in one completion
+# =====================================================
+BATCH_SECTION_RE = re.compile(r"<<<ARTICLE (\d+)>>>\s*(.*?)\s*<<<END \1>>>", re.DOTALL)
+
+BATCH_INSTRUCTIONS = """Summarize each of the {count} articles below. Each article has its OWN format instructions; follow them for that article only.
+
+Output format (strict):
+- Wrap each summary in its markers, exactly like this:
+<<<ARTICLE 1>>>
+...HTML summary of article 1...
+<<<END 1>>>
+- One block per article, in order, numbered as given.
+- Nothing outside the markers.
+
+"""
+
+
+def build_batch_prompt(items):
+    """User prompt packing (text, category) items, each with its own category prompt"""
+    parts = [BATCH_INSTRUCTIONS.format(count=len(items))]
+    for number, (text, category) in enumerate(items, start=1):
+        config = SUMMARY_PROMPTS.get(category, SUMMARY_PROMPTS["development"])
+        parts.append(
+            f"=== ARTICLE {number} ({category}) ===\n"
+            f"FORMAT INSTRUCTIONS:\n{config['prompt'].strip()}\n\n"
+            f"CONTENT:\n{text}\n"
+        )
+    return "\n".join(parts)
+
+
+def parse_batch_response(reply, count):
+    """{article number: raw HTML} for every well-formed, non-empty section in a batch reply"""
+    sections = {}
+    for match in BATCH_SECTION_RE.finditer(reply or ""):
+        number, body = int(match.group(1)), match.group(2).strip()
+        if 1 <= number <= count and body and number not in sections:
+            sections[number] = body
+    return sections
+
+
+def summarize_batch(items, deadline=SUMMARY_DEADLINE):
+    """
+    Summarize several (text, category) items with a single Groq request.
+    The system prompt and request overhead are paid once; each article keeps its
+    category prompt and token budget. Cached items are skipped, and any article
+    whose section is missing or malformed falls back to its own single call.
+    Returns summaries in input order (None where every attempt failed).
+    """
+    started = time.monotonic()
+    if not llm_router.backends:
+        return [f"{text[:150]}..." for text, _ in items]
+    
+    items = [(prepare_article_text(text, category), category) for text, category in items]
+    summaries = [None] * len(items)
+    pending = []
+    for index, (text, category) in enumerate(items):
+        if SUMMARY_CACHE_ENABLED:
+            config = SUMMARY_PROMPTS.get(category, SUMMARY_PROMPTS["development"])
+            cached = lookup_cached_summary(text, config["prompt"], config["tokens"], category)
+            if cached:
+                summaries[index] = cached
+                continue
+        pending.append(index)
+    
+    if len(pending) > 1:
+        batch = [items[i] for i in pending]
+        max_tokens = sum(
+            SUMMARY_PROMPTS.get(category, SUMMARY_PROMPTS["development"])["tokens"] + 20
+            for _, category in batch
+        )
+        label = "batch"
+        print(f"   📦 Summarizing {len(batch)} articles in one request...")
+        batch_deadline = deadline * SUMMARY_BATCH_SHARE - (time.monotonic() - started)
+        reply, backend = llm_chat(build_batch_prompt(batch), max_tokens, label, batch_deadline)
+        sections = parse_batch_response(reply, len(batch))
         
-        return summary
+        for number, index in enumerate(list(pending), start=1):
+            if number not in sections:
+                continue
+            text, category = items[index]
+            summaries[index] = clean_summary(sections[number])
+            if SUMMARY_CACHE_ENABLED:
+                config = SUMMARY_PROMPTS.get(category, SUMMARY_PROMPTS["development"])
+                cache_key = summary_cache_key(text, config["prompt"], config["tokens"], category, backend)
+                save_cached_summary(cache_key, category, backend.model, summaries[index])
+            pending.remove(index)
         
-    except requests.Timeout:
-        print(f"⏱️ Groq timeout for {category}")
-        return None
-    except Exception as e:
-        print(f"❌ Groq error for {category}: {e}")
-        return None
+        if reply is not None and pending:
+            print(f"   ⚠️ {len(pending)} batch section(s) failed to parse, retrying individually")
+    
+    if pending:
+        remaining = max(1.0, deadline - (time.monotonic() - started))
+        executor = ThreadPoolExecutor(max_workers=len(pending))
+        futures = {index: executor.submit(summarize_with_groq, items[index][0], items[index][1], remaining,
+                                          lookup_cache=False)
+                   for index in pending}
+        done, _ = wait(futures.values(), timeout=remaining)
+        executor.shutdown(wait=False, cancel_futures=True)
+        for index, future in futures.items():
+            summaries[index] = future.result() if future in done else None
+    
+    return summaries
 
 
 def ensure_html_formatting(text):
     """Ensure summary has proper HTML formatting"""
-    import re
-    
     # If no HTML tags found, wrap in paragraph
     if '<' not in text:
         return f"<p>{text}</p>"
@@ -222,25 +482,87 @@ def ensure_html_formatting(text):
     return text
 
 
-def summarize_articles(articles_data):
+def fallback_summary(content, category="development"):
+    """
+    Summary used when the LLM is unavailable or too slow: a local extractive
+    summary with the category's section headings (no network involved)
+    """
+    config = SUMMARY_PROMPTS.get(category, SUMMARY_PROMPTS["development"])
+    headings = re.findall(r"<strong>(.*?)</strong>", config["prompt"])
+    summary = structured_summary(content, headings)
+    return summary if summary != "<p></p>" else f"<p>{content[:180]}...</p>"
+
+
+def hedge_deadline(category):
+    """Seconds to wait for Groq before using the local summary: SUMMARY_HEDGE_DEADLINE_<CATEGORY> or the default"""
+    return float(os.getenv(f"SUMMARY_HEDGE_DEADLINE_{category.upper()}", SUMMARY_HEDGE_DEADLINE))
+
+
+# Background pool for hedged Groq calls, which may outlive the caller's wait
+_hedge_pool = ThreadPoolExecutor(max_workers=8)
+
+
+def summarize_hedged(text, category="development", deadline=None):
+    """
+    Race Groq against the local extractive summarizer: the local summary is
+    built while the Groq call runs, and the LLM result is used only if it
+    arrives within the category's hedge deadline. A late Groq result still
+    lands in the summary cache for the next run. Always returns HTML.
+    """
+    if not llm_router.backends:
+        return fallback_summary(text, category)
+    deadline = hedge_deadline(category) if deadline is None else min(deadline, hedge_deadline(category))
+    started = time.monotonic()
+    future = _hedge_pool.submit(summarize_with_groq, text, category, max(deadline, SUMMARY_DEADLINE))
+    local = fallback_summary(text, category)
+    
+    try:
+        summary = future.result(timeout=max(0.0, deadline - (time.monotonic() - started)))
+    except FuturesTimeout:
+        print(f"   ⏱️ Groq missed the {deadline:.1f}s hedge for {category}, using local summary")
+        return local
+    return summary or local
+
+
+def summarize_articles(articles_data, deadline=SUMMARY_DEADLINE):
     """
-    Summarize articles with category-appropriate prompts
+    Summarize articles with category-appropriate prompts.
+    All categories are summarized concurrently (rate-limited to Groq's quotas), so
+    the stage takes roughly one round-trip; anything unfinished at the deadline
+    falls back to the local extractive summary. With SUMMARY_BATCH they share one request.
     """
     if not articles_data:
         return articles_data
     
     # Process single articles (not lists)
+    pending = {}
     for category in ["development", "training", "research", "startup"]:
         article = articles_data.get(category)
-        if article and isinstance(article, dict):
-            content = article.get("content", "")
-            if content:
-                print(f"📝 Summarizing {category}...")
-                summary = summarize_with_groq(content, category=category)
-                if summary:
-                    article["summary"] = summary
-                else:
-                    # Fallback to truncated content
-                    article["summary"] = f"<p>{content[:180]}...</p>"
+        if article and isinstance(article, dict) and article.get("content"):
+            pending[category] = article
+    
+    if not pending:
+        return articles_data
+    
+    if SUMMARY_BATCH:
+        summaries = summarize_batch([(a["content"], c) for c, a in pending.items()], deadline)
+        for (category, article), summary in zip(pending.items(), summaries):
+            article["summary"] = summary or fallback_summary(article["content"], category)
+        return articles_data
+    
+    executor = ThreadPoolExecutor(max_workers=len(pending))
+    futures = {}
+    for category, article in pending.items():
+        print(f"📝 Summarizing {category}...")
+        summarize = summarize_hedged if SUMMARY_HEDGE else summarize_with_groq
+        futures[category] = executor.submit(summarize, article["content"], category, deadline)
+    
+    done, _ = wait(futures.values(), timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+    
+    for category, article in pending.items():
+        future = futures[category]
+        summary = future.result() if future in done else None
+        article["summary"] = summary or fallback_summary(article["content"], category)
     
     return articles_data
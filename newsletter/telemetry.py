@@ -0,0 +1,148 @@
+# newsletter/telemetry.py
+
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Upper bounds (seconds) of the latency histogram buckets; anything slower lands in "+Inf"
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16)
+
+# USD per million (input, output) tokens, overridable with LLM_PRICES as
+# {"model": [input_price, output_price], ...}
+LLM_PRICES = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+try:
+    LLM_PRICES.update({m: tuple(p) for m, p in json.loads(os.getenv("LLM_PRICES", "{}")).items()})
+except (ValueError, TypeError, AttributeError) as e:
+    print(f"⚠️ Ignoring LLM_PRICES: {e}")
+
+
+def call_cost(model, prompt_tokens, completion_tokens):
+    """Estimated USD cost of one call (0 for unknown models)"""
+    input_price, output_price = LLM_PRICES.get(model, (0, 0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def latency_histogram(latencies):
+    """Per-bucket (non-cumulative) counts plus p50/p95/max of latencies in seconds"""
+    buckets = {str(bound): 0 for bound in LATENCY_BUCKETS}
+    buckets["+Inf"] = 0
+    for latency in latencies:
+        bound = next((b for b in LATENCY_BUCKETS if latency <= b), None)
+        buckets["+Inf" if bound is None else str(bound)] += 1
+
+    ordered = sorted(latencies)
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3) if ordered else None
+
+    return {
+        "buckets": buckets,
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": round(ordered[-1], 3) if ordered else None,
+    }
+
+
+class LLMTelemetry:
+    """
+    Per-call LLM records for one pipeline run, aggregated on demand. Calls are
+    recorded when they start (start/finish), so one still running when the run
+    is summarized (e.g. a Groq call that lost its hedge) counts as in flight
+    with its estimated prompt tokens, and finishing late never leaks into the
+    next run's records.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+            self.started_at = time.time()
+
+    def start(self, category, model=None, backend=None, prompt_tokens=0):
+        """Record a call as in flight; pass the returned entry to finish()"""
+        return self.record(category, model=model, backend=backend, prompt_tokens=prompt_tokens, ok=None)
+
+    def finish(self, entry, **fields):
+        """Complete an entry from start() with the call's outcome (ok, tokens, latency...)"""
+        if "latency" in fields:
+            fields["latency"] = round(fields["latency"], 3)
+        with self._lock:
+            entry.update(fields)
+            entry["in_flight"] = False
+
+    def record(self, category, model=None, backend=None, prompt_tokens=0, completion_tokens=0,
+               latency=0.0, ttft=None, retries=0, cache_hit=False, ok=True):
+        entry = {
+            "category": category,
+            "model": model,
+            "backend": backend,
+            "prompt_tokens": prompt_tokens or 0,
+            "completion_tokens": completion_tokens or 0,
+            "latency": round(latency, 3),
+            "ttft": ttft,
+            "retries": retries,
+            "cache_hit": cache_hit,
+            "ok": ok,
+            "in_flight": ok is None,
+        }
+        with self._lock:
+            self.records.append(entry)
+        return entry
+
+    @staticmethod
+    def _aggregate(records):
+        calls = [r for r in records if not r["cache_hit"]]
+        prompt_tokens = sum(r["prompt_tokens"] for r in calls)
+        completion_tokens = sum(r["completion_tokens"] for r in calls)
+        return {
+            "calls": len(calls),
+            "cache_hits": len(records) - len(calls),
+            "in_flight": sum(1 for r in calls if r["in_flight"]),
+            "errors": sum(1 for r in calls if r["ok"] is False),
+            "retries": sum(r["retries"] for r in calls),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": round(sum(call_cost(r["model"], r["prompt_tokens"], r["completion_tokens"]) for r in calls), 6),
+            "latency": latency_histogram([r["latency"] for r in calls if not r["in_flight"]]),
+            "ttft": latency_histogram([r["ttft"] for r in calls if r["ttft"] is not None]),
+        }
+
+    def summary(self):
+        """Totals plus per-category and per-model breakdowns with latency histograms"""
+        with self._lock:
+            records = [dict(r) for r in self.records]
+
+        by_category, by_model = defaultdict(list), defaultdict(list)
+        for r in records:
+            by_category[r["category"]].append(r)
+            if not r["cache_hit"]:
+                by_model[r["model"] or "unknown"].append(r)
+
+        return {
+            "run_started_at": self.started_at,
+            "total": self._aggregate(records),
+            "by_category": {c: self._aggregate(rs) for c, rs in by_category.items()},
+            "by_model": {m: self._aggregate(rs) for m, rs in by_model.items()},
+        }
+
+    def print_summary(self):
+        total = self.summary()["total"]
+        in_flight = f" ({total['in_flight']} still running)" if total["in_flight"] else ""
+        print(f"   📈 LLM: {total['calls']} calls{in_flight}, {total['cache_hits']} cache hits, "
+              f"{total['errors']} errors, {total['retries']} retries, "
+              f"{total['prompt_tokens']}+{total['completion_tokens']} tokens, "
+              f"p95 {total['latency']['p95']}s, ~${total['cost_usd']:.4f}")
+
+
+llm_telemetry = LLMTelemetry()
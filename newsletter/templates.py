@@ -1,10 +1,153 @@
 # newsletter/templates.py
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, ChoiceLoader, TemplateSyntaxError
+from premailer import Premailer
 from datetime import datetime
 import os
+import re
+import hashlib
+import threading
+
+from newsletter.cache import CACHE_DIR
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# Re-check template files for changes on every lookup (handy while editing templates, off in production)
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+TEMPLATE_BYTECODE_DIR = os.path.join(CACHE_DIR, "jinja")
+# Templates with their CSS already inlined, named <template>.<content hash>.inlined.html
+INLINED_TEMPLATES_DIR = os.path.join(CACHE_DIR, "templates")
+
+STYLE_TAG_RE = re.compile(r"<style[\s>]", re.IGNORECASE)
+JINJA_TAG_RE = re.compile(r"\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}", re.DOTALL)
+
+_environment = None
+_environment_lock = threading.Lock()
+_inlined_names = {}
+
+
+def get_environment():
+    """
+    Process-wide Jinja2 environment: each template is parsed and compiled once
+    per process, and the compiled bytecode is kept on disk for later runs.
+    """
+    global _environment
+    with _environment_lock:
+        if _environment is None:
+            bytecode_cache = None
+            try:
+                os.makedirs(TEMPLATE_BYTECODE_DIR, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(TEMPLATE_BYTECODE_DIR)
+            except OSError as e:
+                print(f"⚠️ Template bytecode cache disabled: {e}")
+            _environment = Environment(
+                loader=ChoiceLoader([FileSystemLoader(TEMPLATES_DIR), FileSystemLoader(INLINED_TEMPLATES_DIR)]),
+                bytecode_cache=bytecode_cache,
+                auto_reload=TEMPLATE_AUTO_RELOAD,
+            )
+        return _environment
+
+
+def get_template(name="newsletter.html"):
+    """Compiled template from the shared registry"""
+    return get_environment().get_template(name)
+
+
+def needs_css_inlining(html):
+    """True if the HTML still has <style> rules that email clients would drop"""
+    return bool(STYLE_TAG_RE.search(html))
+
+
+def inline_template_source(source):
+    """
+    CSS-inline a Jinja template's <style> rules into its markup with premailer,
+    leaving Jinja tags intact. Tags are swapped for placeholders first (HTML
+    comments between elements, plain tokens inside tags and text) and restored
+    after. Returns None if the result wouldn't round-trip.
+    """
+    if not needs_css_inlining(source):
+        return source
+    
+    tags = []
+    def protect(match):
+        tags.append(match.group(0))
+        token = f"jinja{len(tags) - 1:05d}x"
+        before = source[:match.start()]
+        inside_tag = before.rfind("<") > before.rfind(">")
+        if inside_tag or match.group(0).startswith("{{"):
+            return token
+        return f"<!--{token}-->"
+    
+    protected = JINJA_TAG_RE.sub(protect, source)
+    try:
+        inlined = Premailer(protected, strip_important=False).transform()
+    except Exception as e:
+        print(f"⚠️ Template CSS inlining failed: {e}")
+        return None
+    
+    for index, tag in enumerate(tags):
+        token = f"jinja{index:05d}x"
+        if inlined.count(token) != 1:
+            print(f"⚠️ Template CSS inlining lost a Jinja tag: {tag}")
+            return None
+        inlined = inlined.replace(f"<!--{token}-->", tag).replace(token, tag)
+    
+    try:
+        get_environment().parse(inlined)
+    except TemplateSyntaxError as e:
+        print(f"⚠️ Inlined template no longer parses: {e}")
+        return None
+    return inlined
+
+
+def get_inlined_template(name="newsletter.html"):
+    """
+    Compiled template whose CSS was inlined at build time, so rendering only
+    substitutes data into an email-ready skeleton. The inlined source is cached
+    on disk keyed by the template's content hash and rebuilt when it changes;
+    if inlining isn't possible the original template is returned.
+    """
+    env = get_environment()
+    with _environment_lock:
+        if name in _inlined_names and not TEMPLATE_AUTO_RELOAD:
+            return env.get_template(_inlined_names[name])
+    
+    source, _, _ = env.loader.get_source(env, name)
+    if not needs_css_inlining(source):
+        inlined_name = name
+    else:
+        stem = os.path.splitext(os.path.basename(name))[0]
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+        inlined_name = f"{stem}.{digest}.inlined.html"
+        path = os.path.join(INLINED_TEMPLATES_DIR, inlined_name)
+        if not os.path.exists(path):
+            print(f"🎨 Pre-inlining CSS for {name}...")
+            inlined = inline_template_source(source)
+            if inlined is None:
+                inlined_name = name
+            else:
+                try:
+                    _write_inlined(path, inlined, stem)
+                except OSError as e:
+                    print(f"⚠️ Could not cache inlined template: {e}")
+                    return env.from_string(inlined)
+    
+    with _environment_lock:
+        _inlined_names[name] = inlined_name
+    return env.get_template(inlined_name)
+
+
+def _write_inlined(path, inlined, stem):
+    """Atomically write an inlined template, removing older builds of the same template"""
+    os.makedirs(INLINED_TEMPLATES_DIR, exist_ok=True)
+    for old in os.listdir(INLINED_TEMPLATES_DIR):
+        if old.startswith(f"{stem}.") and old.endswith(".inlined.html"):
+            os.remove(os.path.join(INLINED_TEMPLATES_DIR, old))
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(inlined)
+    os.replace(tmp_path, path)
 
-TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
 
 def render_newsletter(data):
     """
@@ -46,9 +189,7 @@ def render_newsletter(data):
     # Recipient email (this should come from your email list)
     recipient_email = data.get("recipient_email", "user@example.com")
     
-    # Load template
-    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
-    template = env.get_template("newsletter.html")
+    template = get_inlined_template("newsletter.html")
     
     return template.render(
         # Header
@@ -0,0 +1,16 @@
+# newsletter/youtube.py
+
+import re
+
+# =====================================================
+# 🎥 YOUTUBE URL PATTERNS (compiled once, no dependencies)
+# =====================================================
+YOUTUBE_ID_PATTERN = r'([a-zA-Z0-9_-]{11})'
+
+# Standard/mobile watch?v=, youtu.be short links, embed, shorts, live, and any ?v=/&v= param
+YOUTUBE_URL_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?v=|embed/|shorts/|live/)|youtu\.be/|[?&]v=)' + YOUTUBE_ID_PATTERN
+)
+
+# Embedded players only (<iframe src="https://www.youtube.com/embed/ID">)
+YOUTUBE_EMBED_URL_RE = re.compile(r"^https?://(?:www\.)?youtube\.com/embed/" + YOUTUBE_ID_PATTERN, re.IGNORECASE)
@@ -0,0 +1,99 @@
+# tests/conftest.py
+
+import os
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+# Keep imports of newsletter.database from reaching for a real PostgreSQL server,
+# and template/HTTP caches out of the working tree
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="newsletter-tests-"))
+
+
+class StubServer:
+    """
+    Local HTTP server for tests. `routes` maps a path to a handler
+    `(request) -> (status, headers, body)`; body may be bytes or a list of
+    byte chunks (sent with a flush between them, e.g. SSE events).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.body = self.rfile.read(length) if length else b""
+                stub.requests.append((self.command, self.path))
+                route = stub.routes.get(self.path.split("?")[0])
+                if route is None:
+                    status, headers, body = 404, {}, b"not found"
+                else:
+                    status, headers, body = route(self)
+
+                chunks = body if isinstance(body, list) else [body]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(sum(len(c) for c in chunks)))
+                self.end_headers()
+                for chunk in chunks:
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+
+            do_GET = _handle
+            do_POST = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+    def hits(self, path):
+        return sum(1 for _, p in self.requests if p.split("?")[0] == path)
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def _article(category, title, summary, **extra):
+    return {
+        "category": category, "title": title, "summary": summary, "url": f"https://example.com/{category}",
+        "image": f"https://example.com/{category}.jpg", "source": "Example", "published_date": "Oct 17, 2026",
+        **extra,
+    }
+
+
+@pytest.fixture
+def rendered_issue():
+    """The real newsletter.html template rendered with sample articles (with '&' in their text)"""
+    from newsletter.templates import get_template
+
+    return get_template("newsletter.html").render(
+        newsletter_title="Weekly AI & ML Insights", current_date="October 17, 2026", time_of_day="Morning",
+        year=2026, newsletter_id=7, recipient_email="a@example.com",
+        development=_article("development", "Q&A: shipping RAG at AT&T", "<p><strong>What:</strong> R&D notes</p>"),
+        training=_article("training", "Fine-tuning 101", "<p>Tips &amp; tricks</p>", video_id="dQw4w9WgXcQ"),
+        research=_article("research", "Scaling laws", "<p>x &lt; y</p>"),
+        startup=_article("startup", "Seed round", "<p>Funding&nbsp;news</p>"),
+        tools=[{"name": "Tool&Co", "description": "Build & ship", "link": "https://tool.example.com"}],
+        feedback_url="http://localhost:8000/feedback?newsletter_id=7&email=a%40example.com",
+        unsubscribe_url="#", preferences_url="#", archive_url="#",
+    )
@@ -0,0 +1,32 @@
+# tests/test_assets.py
+
+from newsletter.assets import load_asset, asset_cid_reference
+from newsletter.emailer import build_message
+from newsletter.pipeline import postprocess_html
+
+
+def test_template_logo_is_sent_as_an_inline_part(rendered_issue):
+    html = postprocess_html(rendered_issue)
+    logo = load_asset("vbit_logo.jpg")
+
+    assert f'src="cid:{logo.cid}"' in html
+    assert "data:image" not in html
+
+    msg = build_message(html)
+    assert msg.get_content_type() == "multipart/related"
+    alternative, image = msg.get_payload()
+    assert alternative.get_content_type() == "multipart/alternative"
+    assert image.get_content_type() == "image/jpeg"
+    assert image["Content-ID"] == f"<{logo.cid}>"
+    assert image.get_payload(decode=True) == logo.data
+
+
+def test_only_bundled_assets_are_rewritten():
+    assert asset_cid_reference("../assets/vbit_logo.jpg").startswith("cid:vbit_logo.")
+    assert asset_cid_reference("https://example.com/logo.jpg") is None
+    assert asset_cid_reference("assets/missing.png") is None
+    assert asset_cid_reference("assets/../../database.py") is None
+
+
+def test_html_without_assets_stays_multipart_alternative():
+    assert build_message("<p>hi</p>").get_content_type() == "multipart/alternative"
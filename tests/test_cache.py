@@ -0,0 +1,34 @@
+# tests/test_cache.py
+
+import os
+import time
+
+from newsletter.cache import DiskCache
+
+
+def test_hits_do_not_extend_an_entrys_ttl(tmp_path, monkeypatch):
+    cache = DiskCache("t", ttl=100, directory=str(tmp_path))
+    cache.set("old", "value")
+    stored = time.time()
+
+    monkeypatch.setattr(time, "time", lambda: stored + 90)
+    assert cache.get("old") == "value"  # hit touches mtime (LRU)
+
+    monkeypatch.setattr(time, "time", lambda: stored + 150)
+    assert cache.get("old") is None
+    cache.evict()
+    assert not os.path.exists(cache._path("old"))
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = DiskCache("t", max_bytes=10**6, directory=str(tmp_path))
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 100)
+    old = time.time() - 1000
+    for key in ("a", "b", "c"):
+        os.utime(cache._path(key), (old, old))
+    assert cache.get("a") == "x" * 100  # most recently used now
+
+    cache.max_bytes = os.path.getsize(cache._path("a")) + 10
+    cache.evict()
+    assert [k for k in "abc" if os.path.exists(cache._path(k))] == ["a"]
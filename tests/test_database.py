@@ -0,0 +1,51 @@
+# tests/test_database.py
+
+import os
+import time
+
+from newsletter import archive, database
+from newsletter.database import NewsletterLog
+
+
+def test_failed_telemetry_row_does_not_lose_the_newsletter(monkeypatch):
+    database.init_db()
+    # action/status are NOT NULL, so flushing this row fails
+    monkeypatch.setattr(database, "_telemetry_log",
+                        lambda newsletter_id, telemetry: NewsletterLog(newsletter_id=newsletter_id))
+
+    newsletter_id = database.save_newsletter(
+        "Savepoint issue", content_html="<p>kept</p>",
+        articles=[{"category": "research", "url": "https://example.com/a", "title": "A"}],
+        telemetry={"total": {}}
+    )
+    assert newsletter_id
+    assert database.get_newsletter_html(newsletter_id) == "<p>kept</p>"
+    assert database.log_newsletter_sent(newsletter_id, ["reader@example.com"])
+
+
+def stored_hash(newsletter_id):
+    with database.SessionLocal() as db:
+        return db.get(database.Newsletter, newsletter_id).content_hash
+
+
+def test_pruned_archive_entries_are_cleared_from_their_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(archive, "ARCHIVE_COMPRESSION", "gzip")
+    database.init_db()
+
+    ids = {}
+    for name in ("old", "new"):
+        content_hash, content_size = archive.store(f"<p>{name} issue</p>")
+        ids[name] = database.save_newsletter(f"{name} issue", content_hash=content_hash, content_size=content_size)
+    old_hash = stored_hash(ids["old"])
+    old_path, _ = archive._find(old_hash)
+    aged = time.time() - 40 * 86400
+    os.utime(old_path, (aged, aged))
+
+    removed = archive.prune(retention_days=30, max_issues=0)
+    assert removed == [old_hash]
+    assert database.forget_archived_content(removed) == 1
+
+    assert database.get_newsletter_html(ids["old"]) is None
+    assert stored_hash(ids["old"]) is None
+    assert database.get_newsletter_html(ids["new"]) == "<p>new issue</p>"
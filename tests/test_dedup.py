@@ -0,0 +1,33 @@
+# tests/test_dedup.py
+
+from newsletter import database
+from newsletter.dedup import article_url_key, hash_url_key, normalize_url
+
+LONG_URL = "https://example.com/articles/" + "a" * 600 + "?id=42&utm_source=feed"
+
+
+def test_url_keys_have_a_fixed_length():
+    key = article_url_key(LONG_URL)
+    assert len(LONG_URL) > 500
+    assert len(key) == 64
+    assert key == article_url_key(LONG_URL.replace("https://", "https://www."))
+    assert len(article_url_key("https://youtu.be/x", video_id="dQw4w9WgXcQ")) == 64
+    assert article_url_key("#") is None
+
+
+def test_legacy_unhashed_keys_match_new_keys():
+    assert hash_url_key(normalize_url(LONG_URL)) == article_url_key(LONG_URL)
+    assert hash_url_key(article_url_key(LONG_URL)) == article_url_key(LONG_URL)
+
+
+def test_issue_with_a_long_url_is_saved_and_deduplicated():
+    database.init_db()
+    newsletter_id = database.save_newsletter(
+        "Long URL issue", content_html="<p>hi</p>",
+        articles=[{"category": "research", "url": LONG_URL, "title": "A long one"}]
+    )
+    assert newsletter_id
+    assert database.log_newsletter_sent(newsletter_id, ["reader@example.com"])
+
+    url_keys, _ = database.load_published_keys()
+    assert article_url_key(LONG_URL) in url_keys
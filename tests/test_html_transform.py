@@ -0,0 +1,69 @@
+# tests/test_html_transform.py
+
+from newsletter.html_transform import (
+    transform_html, HTMLVisitor, YouTubeThumbnailVisitor, LinkTaggingVisitor, CSSInlineVisitor
+)
+from newsletter.pipeline import postprocess_html
+
+
+def test_rendered_issue_keeps_bare_ampersands_intact(rendered_issue):
+    html = postprocess_html(rendered_issue, skip_link_prefixes=["http://localhost:8000/feedback"])
+
+    assert "CSE(AI&amp;ML) Newsletter" in html
+    assert "Q&amp;A: shipping RAG at AT&amp;T" in html
+    assert "Tool&amp;Co" in html and "Build &amp; ship" in html
+    for corrupted in ("AI&ML;", "Q&A;", "AT&T;", "R&D;", "Tool&Co;"):
+        assert corrupted not in html
+    assert "Funding&nbsp;news" in html
+    assert "x &lt; y" in html
+
+
+def test_unchanged_markup_round_trips():
+    html = '<p class="a">AT&amp;T &copy; 2026 &#8212; a&nbsp;b</p><style>td > p { color: red }</style>'
+    assert transform_html(html, [HTMLVisitor()]) == '<p class="a">AT&amp;T © 2026 — a&nbsp;b</p><style>td > p { color: red }</style>'
+
+
+def test_bare_ampersands_in_text_are_escaped_not_completed():
+    assert transform_html("<p>AT&T, Q&A</p>", [HTMLVisitor()]) == "<p>AT&amp;T, Q&amp;A</p>"
+
+
+def test_script_and_style_content_is_not_escaped():
+    html = '<script>if (a && b < c) {}</script><style>a[href*="&"] { color: red }</style>'
+    assert transform_html(html, [HTMLVisitor()]) == html
+
+
+def test_youtube_players_become_thumbnails():
+    html = '<div><iframe src="https://www.youtube.com/embed/dQw4w9WgXcQ"><p>fallback</p></iframe></div>'
+    out = transform_html(html, [YouTubeThumbnailVisitor()])
+    assert "i.ytimg.com/vi/dQw4w9WgXcQ/maxresdefault.jpg" in out
+    assert "iframe" not in out and "fallback" not in out
+    assert out.startswith("<div>") and out.endswith("</div>")
+
+
+def test_link_tagging_skips_internal_links_and_keeps_existing_params():
+    visitor = LinkTaggingVisitor({"utm_source": "newsletter"}, skip_prefixes=["https://feedback.example.com"])
+    html = ('<a href="https://example.com/a?x=1&amp;y=2">a</a>'
+            '<a href="https://example.com/b?utm_source=other">b</a>'
+            '<a href="https://feedback.example.com/?id=1">c</a>')
+    out = transform_html(html, [visitor])
+    assert 'href="https://example.com/a?x=1&amp;y=2&amp;utm_source=newsletter"' in out
+    assert 'href="https://example.com/b?utm_source=other"' in out
+    assert 'href="https://feedback.example.com/?id=1"' in out
+
+
+def test_css_inliner_merges_rules_by_specificity():
+    inliner = CSSInlineVisitor()
+    html = ('<style>p { color: red; margin: 0 } .lead { color: blue } @media (max-width: 600px) { p { margin: 4px } }</style>'
+            '<p class="lead" style="margin: 2px">x</p>')
+    out = transform_html(html, [inliner])
+    assert not inliner.unsupported
+    assert '<p class="lead" style="color:blue; margin:2px">' in out
+    assert "@media" in out and ".lead" not in out.split("</style>")[0]
+
+
+def test_complex_selectors_leave_the_whole_stylesheet_to_premailer():
+    html = ('<html><head><style>p { color: red } .box p { color: blue }</style></head>'
+            '<body><div class="box"><p>x</p></div></body></html>')
+    out = postprocess_html(html)
+    assert "color:blue" in out.replace(" ", "")
+    assert "color:red" not in out.replace(" ", "")
@@ -0,0 +1,54 @@
+# tests/test_http_client.py
+
+import threading
+
+from newsletter.http_client import CircuitBreaker
+
+
+def open_breaker(cooldown=0):
+    breaker = CircuitBreaker("example.com", threshold=2, cooldown=cooldown)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = open_breaker(cooldown=60)
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+
+def test_half_open_lets_exactly_one_concurrent_probe_through():
+    breaker = open_breaker(cooldown=0)
+    results = []
+    barrier = threading.Barrier(8)
+
+    def call():
+        barrier.wait()
+        results.append(breaker.allow())
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count(True) == 1
+    assert breaker.is_open()
+
+
+def test_successful_probe_closes_the_circuit():
+    breaker = open_breaker(cooldown=0)
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_for_another_cooldown():
+    breaker = open_breaker(cooldown=0)
+    assert breaker.allow()
+    breaker.cooldown = 60
+    breaker.record_failure()
+    assert breaker.is_open()
+    assert not breaker.allow()
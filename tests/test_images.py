@@ -0,0 +1,89 @@
+# tests/test_images.py
+
+import socket
+import struct
+
+import pytest
+
+from newsletter import images
+from newsletter.cache import DiskCache
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+
+def image_route(data, content_type="image/png", status=206):
+    def handle(request):
+        request.server.last_range = request.headers.get("Range")
+        return status, {"Content-Type": content_type}, data
+    return handle
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "image_cache", DiskCache("images", directory=str(tmp_path)))
+
+
+def unused_port_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/gone.png"
+
+
+def test_sniff_dimensions_png_gif_jpeg():
+    assert images.sniff_dimensions(png_header(800, 450)) == (800, 450)
+    assert images.sniff_dimensions(b"GIF89a" + struct.pack("<HH", 320, 200)) == (320, 200)
+    jpeg = b"\xff\xd8" + b"\xff\xe0\x00\x04\x00\x00" + b"\xff\xc0\x00\x11\x08" + struct.pack(">HH", 480, 640) + b"\x00" * 12
+    assert images.sniff_dimensions(jpeg) == (640, 480)
+    assert images.sniff_dimensions(b"<html>") is None
+
+
+def test_probe_reads_dimensions_with_a_ranged_get(stub_server):
+    stub_server.routes["/big.png"] = image_route(png_header(800, 450))
+    result = images.probe_image(stub_server.url("/big.png"))
+
+    assert result == {"ok": True, "content_type": "image/png", "width": 800, "height": 450}
+    assert stub_server.server.last_range == f"bytes=0-{images.PROBE_BYTES - 1}"
+
+
+@pytest.mark.parametrize("route", [
+    image_route(png_header(50, 50)),                      # too small
+    image_route(b"<html>hi</html>", "text/html", 200),    # not an image
+    image_route(b"missing", "text/plain", 404),
+])
+def test_probe_rejects_bad_images(stub_server, route):
+    stub_server.routes["/img"] = route
+    assert images.probe_image(stub_server.url("/img"))["ok"] is False
+
+
+def test_probe_results_are_cached(stub_server):
+    stub_server.routes["/big.png"] = image_route(png_header(800, 450))
+    url = stub_server.url("/big.png")
+    images.probe_image(url)
+    images.probe_image(url)
+    assert stub_server.hits("/big.png") == 1
+
+
+def test_network_failures_are_not_cached():
+    url = unused_port_url()
+    assert images.probe_image(url)["ok"] is None
+    assert images.image_cache.get(images.content_key({"image_url": url})) is None
+
+
+def test_resolve_image_returns_first_valid_candidate_in_order(stub_server):
+    stub_server.routes["/small.png"] = image_route(png_header(40, 40))
+    stub_server.routes["/big.png"] = image_route(png_header(800, 450))
+    stub_server.routes["/also-big.png"] = image_route(png_header(1200, 600))
+    candidates = [stub_server.url(p) for p in ("/missing.png", "/small.png", "/big.png", "/also-big.png")]
+
+    assert images.resolve_image(candidates) == stub_server.url("/big.png")
+
+
+def test_resolve_image_when_nothing_can_be_checked_or_everything_is_rejected(stub_server):
+    offline = [unused_port_url(), unused_port_url()]
+    assert images.resolve_image(offline) == offline[0]
+
+    stub_server.routes["/small.png"] = image_route(png_header(40, 40))
+    assert images.resolve_image([stub_server.url("/small.png"), stub_server.url("/missing.png")]) is None
@@ -0,0 +1,153 @@
+# tests/test_llm_router.py
+
+import json
+
+import pytest
+
+from newsletter import http_client, summarizer
+from newsletter.llm_router import LLMRouter, LLMBackend
+from newsletter.summarizer import sections_complete, summary_cache_key
+
+PROMPT = "Format:\n<p><strong>🎯 What:</strong> ...</p>\n<p><strong>💡 Why it matters:</strong> ...</p>\n"
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture(autouse=True)
+def fresh_http_state(monkeypatch):
+    """Each test gets its own breakers and no retry backoff"""
+    monkeypatch.setattr(http_client, "_breakers", {})
+    monkeypatch.setattr(http_client, "backoff_delay", lambda attempt: 0)
+
+
+def completion_route(content, usage=None):
+    body = json.dumps({"choices": [{"message": {"content": content}}], "usage": usage}).encode()
+    return lambda request: (200, {"Content-Type": "application/json"}, body)
+
+
+def status_route(status):
+    return lambda request: (status, {"Content-Type": "application/json"}, b'{"error": "down"}')
+
+
+def sse_route(deltas):
+    events = [
+        f"data: {json.dumps({'choices': [{'delta': {'content': d}}]})}\n\n".encode() for d in deltas
+    ] + [b"data: [DONE]\n\n"]
+    return lambda request: (200, {"Content-Type": "text/event-stream"}, events)
+
+
+def backend(stub_server, name, path="/v1/chat"):
+    return LLMBackend(name, stub_server.url(path), f"{name}-model", "key")
+
+
+def test_fails_over_to_the_next_backend_within_one_call(stub_server):
+    stub_server.routes["/down"] = status_route(500)
+    stub_server.routes["/up"] = completion_route("hello", {"prompt_tokens": 5, "completion_tokens": 1})
+    down, up = backend(stub_server, "down", "/down"), backend(stub_server, "up", "/up")
+    router = LLMRouter([down, up])
+
+    reply, chosen, info = router.chat(MESSAGES, 10, 0.7, "test", 10)
+
+    assert (reply, chosen) == ("hello", up)
+    assert info["usage"] == {"prompt_tokens": 5, "completion_tokens": 1}
+    assert info["retries"] == 1
+    # no HTTP retries against a backend that has somewhere to fail over to
+    assert stub_server.hits("/down") == 1
+    assert down.error_rate > 0 and up.latency is not None
+
+
+def test_last_backend_gets_http_retries(stub_server):
+    responses = iter([status_route(503), completion_route("finally")])
+    stub_server.routes["/flaky"] = lambda request: next(responses)(request)
+    router = LLMRouter([backend(stub_server, "flaky", "/flaky")])
+
+    reply, _, info = router.chat(MESSAGES, 10, 0.7, "test", 10)
+
+    assert reply == "finally"
+    assert info["retries"] == 1
+    assert stub_server.hits("/flaky") == 2
+
+
+def test_every_backend_failing_returns_none(stub_server):
+    stub_server.routes["/down"] = status_route(500)
+    router = LLMRouter([backend(stub_server, "a", "/down"), backend(stub_server, "b", "/down")])
+
+    reply, chosen, info = router.chat(MESSAGES, 10, 0.7, "test", 10)
+
+    assert reply is None and chosen is None
+    assert info["retries"] >= 1
+
+
+def test_routes_to_the_fastest_healthy_backend(stub_server):
+    slow, fast, broken = (backend(stub_server, name) for name in ("slow", "fast", "broken"))
+    slow.record_success(2.0)
+    fast.record_success(0.1)
+    broken.record_failure()
+    broken.record_failure()  # error rate above LLM_ERROR_THRESHOLD
+
+    assert LLMRouter([broken, slow, fast]).ordered() == [fast, slow, broken]
+    # untried backends are probed first so they get measured
+    fresh = backend(stub_server, "fresh")
+    assert LLMRouter([slow, fast, fresh]).ordered()[0] is fresh
+
+
+def test_summary_cache_is_keyed_by_the_answering_backend(stub_server, monkeypatch):
+    groq, other = backend(stub_server, "groq"), backend(stub_server, "other")
+    key_groq = summary_cache_key("text", PROMPT, 100, "tool", groq)
+    key_other = summary_cache_key("text", PROMPT, 100, "tool", other)
+    assert key_groq != key_other
+
+    store = {key_other: "<p>from other</p>"}
+    monkeypatch.setattr(summarizer, "get_cached_summary", store.get)
+    monkeypatch.setattr(summarizer, "llm_router", LLMRouter([groq, other]))
+    assert summarizer.lookup_cached_summary("text", PROMPT, 100, "tool") == "<p>from other</p>"
+
+    monkeypatch.setattr(summarizer, "llm_router", LLMRouter([groq]))
+    assert summarizer.lookup_cached_summary("text", PROMPT, 100, "tool") is None
+
+
+def test_stream_cut_off_keeps_text_up_to_the_closing_tag(stub_server):
+    stub_server.routes["/v1/chat"] = sse_route([
+        "<p><strong>What:</strong> A new open model.</p>\n",
+        "<p><strong>Why it matters:</strong> Cheaper inference for ",
+        "apps now.</p>\nEXT",
+        "RA TEXT THAT SHOULD NEVER ARRIVE",
+    ])
+    router = LLMRouter([backend(stub_server, "stub")])
+    reply, chosen, info = router.chat(
+        MESSAGES, 100, 0.7, "test", 10, stream=True,
+        stop_when=lambda partial: sections_complete(partial, PROMPT),
+    )
+
+    assert chosen.name == "stub"
+    assert reply.endswith("apps now.</p>")
+    assert "EXT" not in reply
+    assert info["ttft"] is not None
+
+
+def test_sections_complete_needs_every_heading_and_a_closed_last_section():
+    assert sections_complete("<p><strong>What:</strong> x</p>", PROMPT) == 0
+    assert sections_complete("<p><strong>What:</strong> x</p><p><strong>Why it matters:</strong> short</p>", PROMPT) == 0
+    text = "<p><strong>WHAT:</strong> x</p><p><strong>Why it matters:</strong> long enough to count here</p> tail"
+    assert text[:sections_complete(text, PROMPT)].endswith("count here</p>")
+
+
+def test_batch_fallback_looks_up_the_cache_once_and_keeps_deadline(stub_server, monkeypatch):
+    lookups, deadlines = [], []
+    monkeypatch.setattr(summarizer, "llm_router", LLMRouter([backend(stub_server, "stub")]))
+    monkeypatch.setattr(summarizer, "get_cached_summary", lambda key: lookups.append(key))
+    monkeypatch.setattr(summarizer, "save_cached_summary", lambda *args: None)
+
+    def fake_chat(prompt, max_tokens, label, deadline, stop_when=None):
+        deadlines.append((label, deadline))
+        if label == "batch":
+            return None, None
+        return f"<p>{label} summary</p>", summarizer.llm_router.backends[0]
+
+    monkeypatch.setattr(summarizer, "llm_chat", fake_chat)
+    summaries = summarizer.summarize_batch([("first article", "research"), ("second article", "tool")], deadline=20)
+
+    assert summaries == ["<p>research summary</p>", "<p>tool summary</p>"]
+    assert len(lookups) == 2  # one per item, none repeated by the fallback
+    batch_deadline = dict(deadlines)["batch"]
+    assert batch_deadline <= 20 * summarizer.SUMMARY_BATCH_SHARE
+    assert all(deadline > 20 - batch_deadline - 1 for label, deadline in deadlines if label != "batch")
@@ -0,0 +1,59 @@
+# tests/test_payload.py
+
+from newsletter.html_transform import parse_declarations, split_declarations, transform_html, CSSInlineVisitor
+from newsletter.pipeline import (
+    postprocess_html, optimize_payload, strip_comments, dedupe_inline_styles, strip_unused_classes,
+    collapse_whitespace
+)
+
+DATA_URI = "url(data:image/png;base64,iVBORw0KGgo=)"
+
+
+def test_parse_declarations_respects_quotes_parentheses_and_entities():
+    assert parse_declarations("font-family: &quot;Segoe UI&quot;, Arial; color:red") == {
+        "font-family": "&quot;Segoe UI&quot;, Arial", "color": "red",
+    }
+    assert parse_declarations(f"background: {DATA_URI}; color: red") == {"background": DATA_URI, "color": "red"}
+    assert parse_declarations("content: 'a;b'; font-family: \"x;y\"") == {"content": "'a;b'", "font-family": '"x;y"'}
+    assert parse_declarations("content: &#59;") == {"content": "&#59;"}
+
+
+def test_unbalanced_declarations_are_not_parsed():
+    assert split_declarations("font-family: 'Segoe UI; color: red") is None
+    assert split_declarations("background: url(x; color: red") is None
+    assert parse_declarations("color: red)") is None
+
+
+def test_dedupe_keeps_the_last_value_and_leaves_unparseable_styles_alone():
+    assert dedupe_inline_styles('<p style="color: red; margin: 0; color: blue">') == '<p style="color:blue;margin:0">'
+    quoted = '<td style="font-family: &quot;Segoe UI&quot;, Arial; color:red; color:red">'
+    assert dedupe_inline_styles(quoted) == '<td style="font-family:&quot;Segoe UI&quot;, Arial;color:red">'
+    data = f'<div style="background: {DATA_URI}; color: red">'
+    assert dedupe_inline_styles(data) == f'<div style="background:{DATA_URI};color:red">'
+    broken = '<p style="font-family: &quot;Segoe UI; color: red">'
+    assert dedupe_inline_styles(broken) == broken
+
+
+def test_inlined_quoted_fonts_survive_the_payload_optimizer():
+    html = ('<html><head><style>td { font-family: "Segoe UI", Arial; color: #333 }</style></head>'
+            '<body><table><tr><td style="padding: 4px">x</td></tr></table></body></html>')
+    out = optimize_payload(postprocess_html(html), budget=10**6, mode="warn")
+    assert 'style="font-family:&quot;Segoe UI&quot;, Arial;color:#333;padding:4px"' in out
+
+
+def test_css_inliner_leaves_unparseable_rules_to_premailer():
+    inliner = CSSInlineVisitor()
+    transform_html("<style>p { font-family: 'Segoe UI; color: red }</style><p>x</p>", [inliner])
+    assert inliner.unsupported
+
+
+def test_minifier_steps():
+    assert strip_comments("a<!-- x -->b<!--[if mso]>o<![endif]-->") == "ab<!--[if mso]>o<![endif]-->"
+    assert strip_unused_classes('<style>.keep{}</style><p class="keep drop">') == '<style>.keep{}</style><p class="keep">'
+    assert collapse_whitespace("<p>a   b\n\n c  d</p><pre> x  y </pre>") == "<p>a b\nc  d</p><pre> x  y </pre>"
+
+
+def test_budget_modes():
+    big = "<p>" + "x" * 500 + "</p>"
+    assert optimize_payload(big, budget=100, mode="fail") is None
+    assert optimize_payload(big, budget=100, mode="warn") == big
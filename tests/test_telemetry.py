@@ -0,0 +1,39 @@
+# tests/test_telemetry.py
+
+from newsletter.telemetry import LLMTelemetry
+
+
+def test_in_flight_calls_count_towards_tokens_and_cost():
+    telemetry = LLMTelemetry()
+    telemetry.record("tool", cache_hit=True)
+    done = telemetry.start("research", model="llama-3.1-8b-instant", backend="groq", prompt_tokens=1000)
+    telemetry.finish(done, prompt_tokens=900, completion_tokens=200, latency=1.2345, ok=True)
+    telemetry.start("startup", model="llama-3.1-8b-instant", backend="groq", prompt_tokens=1000)
+
+    total = telemetry.summary()["total"]
+    assert total["calls"] == 2
+    assert total["in_flight"] == 1
+    assert total["cache_hits"] == 1
+    assert total["errors"] == 0
+    assert total["prompt_tokens"] == 1900
+    assert total["completion_tokens"] == 200
+    assert total["cost_usd"] > 0
+    assert total["latency"]["max"] == 1.234
+
+
+def test_late_finish_does_not_leak_into_the_next_run():
+    telemetry = LLMTelemetry()
+    hedged_out = telemetry.start("research", model="llama-3.1-8b-instant", prompt_tokens=500)
+    telemetry.reset()
+    telemetry.finish(hedged_out, completion_tokens=300, latency=9.0, ok=True)
+
+    assert telemetry.summary()["total"]["calls"] == 0
+
+
+def test_failed_calls_are_errors():
+    telemetry = LLMTelemetry()
+    entry = telemetry.start("tool", prompt_tokens=100)
+    telemetry.finish(entry, prompt_tokens=0, latency=3.0, ok=False)
+
+    total = telemetry.summary()["total"]
+    assert (total["errors"], total["in_flight"]) == (1, 0)